@@ -0,0 +1,92 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, func, insert, literal, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import settings
+from .database import AsyncSessionLocal
+from .jobs import spawn
+from .models import models
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary constant key; one summary rebuild at a time across workers on Postgres
+SUMMARY_LOCK_ID = 72410302
+
+_dirty = False
+_refresh_task: Optional[asyncio.Task] = None
+
+
+def _summary_rows(now: datetime):
+    employee = models.Employee
+    return select(
+        employee.department_id,
+        employee.status,
+        func.count(),
+        func.count(employee.ctc),
+        func.coalesce(func.sum(employee.ctc), 0),
+        func.count(employee.monthly_salary),
+        func.coalesce(func.sum(employee.monthly_salary), 0),
+        literal(now),
+    ).group_by(employee.department_id, employee.status)
+
+
+async def refresh_summary(session: AsyncSession) -> datetime:
+    """Rebuild employee_summary from a single GROUP BY over employees, in one transaction."""
+    if session.get_bind().dialect.name == "postgresql":
+        await session.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": SUMMARY_LOCK_ID})
+    now = datetime.utcnow()
+    summary = models.EmployeeSummary
+    await session.execute(delete(summary))
+    await session.execute(
+        insert(summary).from_select(
+            [
+                summary.department_id, summary.status, summary.headcount,
+                summary.ctc_count, summary.ctc_total,
+                summary.monthly_salary_count, summary.monthly_salary_total,
+                summary.refreshed_at,
+            ],
+            _summary_rows(now),
+        )
+    )
+    await session.commit()
+    return now
+
+
+async def ensure_fresh_summary(session: AsyncSession) -> datetime:
+    # Writes through the API refresh the summary shortly after they commit; the max age
+    # catches changes made elsewhere (imports run from scripts, manual SQL, other services)
+    refreshed_at = await session.scalar(select(func.max(models.EmployeeSummary.refreshed_at)))
+    if refreshed_at is None or datetime.utcnow() - refreshed_at > timedelta(seconds=settings.ANALYTICS_SUMMARY_MAX_AGE):
+        refreshed_at = await refresh_summary(session)
+    return refreshed_at
+
+
+async def _refresh_when_quiet():
+    global _dirty
+    try:
+        # Writes that land while a rebuild runs set _dirty again and get one more pass
+        while _dirty:
+            await asyncio.sleep(settings.ANALYTICS_REFRESH_DELAY)
+            _dirty = False
+            async with AsyncSessionLocal() as session:
+                await refresh_summary(session)
+    except Exception:
+        logger.exception("Employee summary refresh failed; it will be rebuilt on the next write or read")
+
+
+def schedule_summary_refresh():
+    """Call after committing a change to employees.
+
+    Bursts of writes (bulk imports, batch edits) are coalesced into one rebuild
+    ANALYTICS_REFRESH_DELAY seconds after the first of them.
+    """
+    global _dirty, _refresh_task
+    if not settings.ANALYTICS_SUMMARY:
+        return
+    _dirty = True
+    if _refresh_task is None or _refresh_task.done():
+        _refresh_task = spawn(_refresh_when_quiet())
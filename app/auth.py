@@ -0,0 +1,202 @@
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Hashable, Optional, Tuple
+from uuid import uuid4
+
+from fastapi import Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordBearer
+from jose import JWTError, jwt
+from sqlalchemy import delete, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import settings
+from .database import AsyncSessionLocal, get_db
+from .jobs import spawn
+from .models import models
+from .schemas import schemas
+
+logger = logging.getLogger(__name__)
+
+ALGORITHM = "HS256"
+# Revocations committed this long before the newest one seen are re-read, covering clock skew between workers
+REVOCATION_OVERLAP = timedelta(seconds=60)
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login", auto_error=False)
+
+
+def create_access_token(data: dict, expires_delta: timedelta = None):
+    to_encode = data.copy()
+    now = datetime.utcnow()
+    expire = now + (expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
+    # jti identifies this token so it can be revoked on its own
+    to_encode.update({"exp": expire, "iat": now, "jti": uuid4().hex})
+    return jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=ALGORITHM)
+
+
+class ExpiringLRU:
+    """Bounded LRU whose entries each carry their own expiry (a Unix timestamp)."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, expires: float):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def _digest(token: str) -> bytes:
+    # Keyed by digest so the cache never holds usable bearer tokens
+    return hashlib.sha256(token.encode()).digest()
+
+
+class RevocationList:
+    """Ids of revoked, unexpired tokens, held in memory for an O(1) check per request.
+
+    Revocations are written to revoked_tokens; every worker re-reads new rows at
+    most every AUTH_REVOCATION_SYNC seconds in the background, so a logout on
+    one worker reaches the others within that interval.
+    """
+
+    def __init__(self):
+        self._revoked: Dict[str, float] = {}  # jti -> expiry timestamp
+        self._since: Optional[datetime] = None
+        self._loaded = False
+        self._next_sync = 0.0
+        self._syncing = None
+
+    def __contains__(self, jti: Optional[str]) -> bool:
+        return jti is not None and jti in self._revoked
+
+    async def sync(self):
+        started = time.monotonic()
+        token = models.RevokedToken
+        query = select(token.jti, token.expires_at, token.revoked_at).where(token.expires_at > datetime.utcnow())
+        if self._since is not None:
+            query = query.where(token.revoked_at >= self._since - REVOCATION_OVERLAP)
+        async with AsyncSessionLocal() as session:
+            rows = (await session.execute(query)).all()
+        for jti, expires_at, revoked_at in rows:
+            self._revoked[jti] = expires_at.replace(tzinfo=timezone.utc).timestamp()
+            self._since = max(self._since or revoked_at, revoked_at)
+        now = time.time()
+        self._revoked = {jti: expires for jti, expires in self._revoked.items() if expires > now}
+        self._loaded = True
+        # Only a successful read counts: until the first one, every request retries it
+        self._next_sync = started + settings.AUTH_REVOCATION_SYNC
+
+    async def _sync_in_background(self):
+        try:
+            await self.sync()
+        except Exception as e:
+            # Keep checking against the list already loaded; try again after the usual interval
+            self._next_sync = time.monotonic() + settings.AUTH_REVOCATION_SYNC
+            logger.warning("Could not refresh revoked tokens: %s", e)
+
+    async def ensure_fresh(self):
+        if self._loaded and time.monotonic() < self._next_sync:
+            return
+        if not self._loaded:
+            # Until the list has been read once, a revoked token could pass: wait for it
+            try:
+                await self.sync()
+            except Exception as e:
+                logger.error("Could not load revoked tokens: %s", e)
+                raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Authentication is unavailable")
+            return
+        if self._syncing is None or self._syncing.done():
+            self._syncing = spawn(self._sync_in_background())
+
+    async def revoke(self, db: AsyncSession, jti: str, expires: float):
+        expires_at = datetime.utcfromtimestamp(expires)
+        # A second logout with the same token is a no-op, not a primary key violation
+        dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+        await db.execute(
+            dialect.insert(models.RevokedToken)
+            .values(jti=jti, expires_at=expires_at, revoked_at=datetime.utcnow())
+            .on_conflict_do_nothing(index_elements=["jti"])
+        )
+        await db.execute(delete(models.RevokedToken).where(models.RevokedToken.expires_at < datetime.utcnow()))
+        await db.commit()
+        self._revoked[jti] = expires
+
+
+token_cache = ExpiringLRU(settings.AUTH_TOKEN_CACHE_SIZE)
+user_cache = ExpiringLRU(settings.AUTH_USER_CACHE_SIZE)
+revocations = RevocationList()
+
+
+def _unauthorized(detail: str = "Could not validate credentials") -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED, detail=detail, headers={"WWW-Authenticate": "Bearer"}
+    )
+
+
+async def get_token_claims(token: Optional[str] = Depends(oauth2_scheme)) -> dict:
+    """Verified claims of the bearer token; no database access unless the revocation list is due a refresh."""
+    if not token:
+        raise _unauthorized("Not authenticated")
+    await revocations.ensure_fresh()
+    key = _digest(token)
+    claims = token_cache.get(key)
+    if claims is None:
+        try:
+            claims = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[ALGORITHM])
+        except JWTError:
+            raise _unauthorized()
+        if "sub" not in claims or "exp" not in claims:
+            raise _unauthorized()
+        # Cached until the token's own expiry, so an expired token is never served from here
+        token_cache.set(key, claims, claims["exp"])
+    if claims.get("jti") in revocations:
+        raise _unauthorized("Token has been revoked")
+    return claims
+
+
+async def get_current_user(
+    claims: dict = Depends(get_token_claims),
+    db: AsyncSession = Depends(get_db)
+) -> schemas.User:
+    """The token's user record, reused for AUTH_USER_CACHE_TTL seconds."""
+    user = user_cache.get(claims["sub"])
+    if user is None:
+        record = await db.scalar(select(models.User).where(models.User.email == claims["sub"]))
+        if record is None:
+            raise _unauthorized()
+        user = schemas.User.model_validate(record)
+        if settings.AUTH_USER_CACHE_TTL > 0:
+            user_cache.set(claims["sub"], user, time.time() + settings.AUTH_USER_CACHE_TTL)
+    return user
+
+
+async def auth_gate(token: Optional[str] = Depends(oauth2_scheme)):
+    """Router-level dependency: enforces a valid token only when AUTH_REQUIRED is on."""
+    if settings.AUTH_REQUIRED:
+        await get_token_claims(token)
@@ -0,0 +1,272 @@
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import Response
+from sqlalchemy.engine import make_url
+
+from .config import settings
+
+try:
+    import redis.asyncio as redis
+except ImportError:  # optional dependency, only needed for CACHE_BACKEND=redis
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "hr_cache_invalidate"
+# Listener reconnect backoff and the interval at which an idle listener connection is checked, in seconds
+LISTENER_RETRY_MIN = 1.0
+LISTENER_RETRY_MAX = 60.0
+LISTENER_HEARTBEAT = 30.0
+
+
+class MemoryBackend:
+    """Per-process LRU with TTL. Namespace versions live in this process."""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._versions: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    async def version(self, namespace: str) -> int:
+        return self._versions[namespace]
+
+    async def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    async def set(self, key: str, value: bytes):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def bump(self, namespace: str):
+        prefix = f"{namespace}:"
+        with self._lock:
+            self._versions[namespace] += 1
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+
+class RedisBackend:
+    """Shared cache; versions are Redis counters, so every worker sees an invalidation at once."""
+
+    def __init__(self, url: str, ttl: float):
+        if redis is None:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package")
+        self.ttl = ttl
+        self._client = redis.from_url(url)
+
+    async def version(self, namespace: str) -> int:
+        return int(await self._client.get(f"hr:cache-version:{namespace}") or 0)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._client.get(f"hr:cache:{key}")
+
+    async def set(self, key: str, value: bytes):
+        await self._client.set(f"hr:cache:{key}", value, ex=max(int(self.ttl), 1))
+
+    async def bump(self, namespace: str):
+        # Old-version keys are never read again and expire on their TTL
+        await self._client.incr(f"hr:cache-version:{namespace}")
+
+
+class ResponseCache:
+    """Read-through cache of serialized JSON responses, grouped into namespaces.
+
+    Keys embed the namespace version read before the DB query, so a response
+    computed concurrently with an invalidation is stored under the old version
+    and never served. With the memory backend on Postgres, invalidations are
+    fanned out to the other workers with NOTIFY; the TTL bounds staleness if
+    the listener is down.
+    """
+
+    def __init__(self):
+        self.backend = None
+        self.stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"hits": 0, "misses": 0, "invalidations": 0})
+        self._listener = None
+        self._listen_task: Optional[asyncio.Task] = None
+
+    def configure(self):
+        if settings.CACHE_BACKEND == "redis":
+            self.backend = RedisBackend(settings.REDIS_URL or "redis://localhost:6379/0", settings.CACHE_TTL)
+        elif settings.CACHE_BACKEND == "memory":
+            self.backend = MemoryBackend(settings.CACHE_MAX_ENTRIES, settings.CACHE_TTL)
+        else:
+            self.backend = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    async def get_or_load(
+        self,
+        namespace: str,
+        key: str,
+        loader: Callable[[], Awaitable[Tuple[bytes, Dict[str, str]]]]
+    ) -> Response:
+        """Serve ``namespace:key`` from the cache, or call ``loader`` for (body, headers) and store it."""
+        if not self.enabled:
+            body, headers = await loader()
+            return Response(content=body, media_type="application/json", headers=headers)
+
+        version = await self.backend.version(namespace)
+        full_key = f"{namespace}:v{version}:{key}"
+        cached = await self.backend.get(full_key)
+        if cached is not None:
+            self.stats[namespace]["hits"] += 1
+            raw_headers, body = cached.split(b"\n", 1)
+            return Response(content=body, media_type="application/json", headers=json.loads(raw_headers))
+
+        self.stats[namespace]["misses"] += 1
+        body, headers = await loader()
+        await self.backend.set(full_key, json.dumps(headers).encode() + b"\n" + body)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    async def invalidate(self, *namespaces: str):
+        if not self.enabled:
+            return
+        for namespace in namespaces:
+            await self.backend.bump(namespace)
+            self.stats[namespace]["invalidations"] += 1
+        if isinstance(self.backend, MemoryBackend):
+            await self._notify(namespaces)
+
+    def snapshot(self) -> dict:
+        namespaces = {}
+        for namespace, counts in self.stats.items():
+            lookups = counts["hits"] + counts["misses"]
+            namespaces[namespace] = dict(counts, hit_rate=round(counts["hits"] / lookups, 4) if lookups else 0.0)
+        return {
+            "backend": settings.CACHE_BACKEND,
+            "listener": self._listener is not None and not self._listener.is_closed(),
+            "namespaces": namespaces,
+        }
+
+    # Cross-worker invalidation for the memory backend via Postgres LISTEN/NOTIFY
+
+    def _dsn(self) -> Optional[str]:
+        from .database import SQLALCHEMY_DATABASE_URL
+        url = make_url(SQLALCHEMY_DATABASE_URL)
+        if url.get_backend_name() != "postgresql" or not settings.CACHE_NOTIFY:
+            return None
+        return url.set(drivername="postgresql").render_as_string(hide_password=False)
+
+    def _listening_here(self) -> bool:
+        task = self._listen_task
+        return task is not None and not task.done() and task.get_loop() is asyncio.get_running_loop()
+
+    def start_listener(self):
+        """Start listening for other workers' invalidations; called once from the startup warm-up."""
+        if not isinstance(self.backend, MemoryBackend) or self._dsn() is None or self._listening_here():
+            return
+        self._listen_task = asyncio.get_running_loop().create_task(self._listen())
+
+    async def _listen(self):
+        # Runs for the life of the worker, off the request path: requests never open this connection
+        import asyncpg
+        delay = LISTENER_RETRY_MIN
+        reconnect = False
+        while True:
+            try:
+                connection = await asyncpg.connect(self._dsn())
+                lost = asyncio.Event()
+                connection.add_termination_listener(lambda _: lost.set())
+                await connection.add_listener(NOTIFY_CHANNEL, self._on_notify)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Keep serving; the TTL bounds staleness until the listener comes back
+                logger.warning("Cache invalidation listener unavailable, retrying in %.0fs: %s", delay, e)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, LISTENER_RETRY_MAX)
+                continue
+            self._listener = connection
+            delay = LISTENER_RETRY_MIN
+            if reconnect:
+                # Invalidations sent while we were disconnected are lost: drop what this worker cached
+                for namespace in list(self.stats):
+                    await self.backend.bump(namespace)
+            reconnect = True
+            try:
+                while not lost.is_set():
+                    try:
+                        await asyncio.wait_for(lost.wait(), timeout=LISTENER_HEARTBEAT)
+                    except asyncio.TimeoutError:
+                        # A dead peer without a FIN only shows up when the connection is used
+                        await connection.execute("SELECT 1")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Cache invalidation listener lost: %s", e)
+            finally:
+                self._listener = None
+                if not connection.is_closed():
+                    connection.terminate()
+
+    def _on_notify(self, connection, pid, channel, payload):
+        backend = self.backend
+        if not isinstance(backend, MemoryBackend):
+            return
+        for namespace in payload.split(","):
+            asyncio.get_running_loop().create_task(backend.bump(namespace))
+
+    async def _notify(self, namespaces):
+        if self._dsn() is None:
+            return
+        from .database import async_engine
+        from sqlalchemy import text
+        try:
+            async with async_engine.connect() as conn:
+                await conn.execute(text("SELECT pg_notify(:channel, :payload)"),
+                                   {"channel": NOTIFY_CHANNEL, "payload": ",".join(namespaces)})
+                await conn.commit()
+        except Exception as e:
+            logger.warning("Could not broadcast cache invalidation: %s", e)
+
+    async def close(self):
+        if self._listening_here():
+            self._listen_task.cancel()
+            await asyncio.gather(self._listen_task, return_exceptions=True)
+        self._listen_task = None
+        if self._listener is not None:
+            await self._listener.close()
+            self._listener = None
+
+
+response_cache = ResponseCache()
+response_cache.configure()
+
+# Browsers keep listings but revalidate them each time, which the weak ETag makes a cheap 304
+LISTING_CACHE_CONTROL = "private, no-cache"
+
+
+async def collection_etag(db, model, *parts) -> str:
+    """Opaque tag for a listing of ``model``, from one MAX(updated_at)/COUNT(*) aggregate.
+
+    Inserts and updates move the newest updated_at, deletes change the count;
+    ``parts`` (page parameters) keep the tags of different pages apart. Send it
+    as a weak validator: equal tags mean equivalent, not byte-identical, JSON.
+    """
+    from sqlalchemy import func, select
+    updated_at, count = (await db.execute(select(func.max(model.updated_at), func.count()).select_from(model))).one()
+    source = "|".join([updated_at.isoformat() if updated_at else "", str(count), *map(str, parts)])
+    return '"' + hashlib.sha1(source.encode()).hexdigest()[:20] + '"'
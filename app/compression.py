@@ -0,0 +1,138 @@
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from .config import settings
+
+try:
+    import brotli
+except ImportError:  # optional: without it every client that accepts gzip gets gzip
+    brotli = None
+
+# Media type prefixes that are already compressed (stored uploads: PDF, images, archives) or must not be buffered
+EXCLUDED_CONTENT_TYPES = (
+    "application/gzip", "application/x-gzip", "application/zip", "application/grpc", "application/pdf",
+    "application/octet-stream", "audio/", "font/woff", "image/avif", "image/gif", "image/jpeg", "image/png",
+    "image/webp", "text/event-stream", "video/",
+)
+
+
+def _accepted(accept_encoding: str) -> set:
+    codings = set()
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = params.strip()
+        if quality.startswith("q="):
+            try:
+                if float(quality[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        codings.add(coding.strip().lower())
+    return codings
+
+
+class _GzipCompressor:
+    encoding = "gzip"
+
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def chunk(self, data: bytes) -> bytes:
+        # Sync-flushed so streamed responses (NDJSON search) reach the client as they are produced
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush()
+
+
+class _BrotliCompressor:
+    encoding = "br"
+
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.finish()
+
+
+def _compressible(headers: Headers) -> bool:
+    if "content-encoding" in headers:
+        return False
+    # A strong ETag promises byte-identical content (document downloads, byte ranges): send those as stored
+    if headers.get("etag", "").startswith('"'):
+        return False
+    return not headers.get("content-type", "").lower().startswith(EXCLUDED_CONTENT_TYPES)
+
+
+class CompressionMiddleware:
+    """gzip or brotli for responses of at least COMPRESSION_MINIMUM_SIZE bytes, streaming included.
+
+    Brotli is preferred when the client accepts it and the package is installed.
+    A plain ASGI wrapper: the start message is held back until the first body
+    chunk shows whether the response is worth compressing, small bodies go out
+    untouched and streamed chunks are flushed instead of buffered.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    def _compressor(self, accepted: set):
+        if brotli is not None and "br" in accepted:
+            return _BrotliCompressor(settings.BROTLI_QUALITY)
+        if "gzip" in accepted:
+            return _GzipCompressor(settings.GZIP_LEVEL)
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        compressor = self._compressor(_accepted(Headers(scope=scope).get("accept-encoding", "")))
+        if compressor is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        compressing = None  # decided on the first body chunk
+
+        async def send_compressed(message):
+            nonlocal start, compressing
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                # Anything else (e.g. pathsend) goes out as the app produced it
+                if start is not None:
+                    await send(start)
+                    start = None
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressing is None:
+                headers = MutableHeaders(raw=start["headers"])
+                compressing = _compressible(headers) and (more_body or len(body) >= settings.COMPRESSION_MINIMUM_SIZE)
+                if compressing:
+                    body = compressor.chunk(body) if more_body else compressor.finish(body)
+                    headers["Content-Encoding"] = compressor.encoding
+                    headers.add_vary_header("Accept-Encoding")
+                    if more_body:
+                        del headers["Content-Length"]
+                    else:
+                        headers["Content-Length"] = str(len(body))
+                await send(start)
+                start = None
+                await send({"type": "http.response.body", "body": body, "more_body": more_body})
+                return
+
+            if compressing:
+                body = compressor.chunk(body) if more_body else compressor.finish(body)
+                message = {"type": "http.response.body", "body": body, "more_body": more_body}
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
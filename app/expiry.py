@@ -0,0 +1,109 @@
+import asyncio
+import logging
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, func, insert, literal, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import settings
+from .database import AsyncSessionLocal
+from .models import models
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary constant key; only one worker scans at a time on Postgres, the others skip their turn
+EXPIRY_LOCK_ID = 72410304
+# Seconds before a woken scanner that lost the lock tries again
+LOCK_RETRY_DELAY = 5.0
+
+_wake: Optional[asyncio.Event] = None
+_worker: Optional[asyncio.Task] = None
+
+
+def _expiring_rows(horizon: date, now: datetime):
+    document = models.Document
+    # Range predicate on the indexed column; expired documents are included on purpose
+    return select(
+        document.id, document.employee_id, document.title, document.type, document.number,
+        document.expiry_date, literal(now),
+    ).where(document.expiry_date <= horizon)
+
+
+async def scan_expiring_documents(session: AsyncSession) -> Optional[datetime]:
+    """Rebuild expiring_documents in one transaction; None if another worker holds the scan."""
+    if session.get_bind().dialect.name == "postgresql":
+        locked = await session.scalar(text("SELECT pg_try_advisory_xact_lock(:id)"), {"id": EXPIRY_LOCK_ID})
+        if not locked:
+            await session.rollback()
+            return None
+    now = datetime.utcnow()
+    horizon = now.date() + timedelta(days=settings.DOCUMENT_EXPIRY_WINDOW_DAYS)
+    expiring = models.ExpiringDocument
+    await session.execute(delete(expiring))
+    await session.execute(
+        insert(expiring).from_select(
+            [
+                expiring.document_id, expiring.employee_id, expiring.title, expiring.type, expiring.number,
+                expiring.expiry_date, expiring.scanned_at,
+            ],
+            _expiring_rows(horizon, now),
+        )
+    )
+    await session.commit()
+    return now
+
+
+async def ensure_fresh_scan(session: AsyncSession) -> Optional[datetime]:
+    # The window moves with the calendar, so yesterday's scan is stale even if recent
+    scanned_at = await session.scalar(select(func.max(models.ExpiringDocument.scanned_at)))
+    now = datetime.utcnow()
+    max_age = timedelta(seconds=settings.DOCUMENT_EXPIRY_SCAN_INTERVAL * 2 or 3600)
+    if scanned_at is None or scanned_at.date() != now.date() or now - scanned_at > max_age:
+        scanned_at = await scan_expiring_documents(session) or scanned_at
+    return scanned_at
+
+
+def request_expiry_scan():
+    """Call after committing a change to documents; wakes this worker's scanner early."""
+    if _wake is not None:
+        _wake.set()
+
+
+async def _run_worker():
+    retry = False
+    while True:
+        woken = retry or _wake.is_set()
+        _wake.clear()
+        lost = False
+        try:
+            async with AsyncSessionLocal() as session:
+                lost = await scan_expiring_documents(session) is None
+        except Exception:
+            logger.exception("Document expiry scan failed; retrying on the next interval")
+        # The scan that held the lock may have read documents before the change that woke us
+        retry = lost and woken
+        try:
+            await asyncio.wait_for(_wake.wait(), timeout=LOCK_RETRY_DELAY if retry else settings.DOCUMENT_EXPIRY_SCAN_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+
+
+def _running_here() -> bool:
+    return _worker is not None and not _worker.done() and _worker.get_loop() is asyncio.get_running_loop()
+
+
+def start_expiry_worker():
+    global _wake, _worker
+    if settings.DOCUMENT_EXPIRY_SCAN_INTERVAL <= 0 or _running_here():
+        return
+    _wake = asyncio.Event()
+    _worker = asyncio.get_running_loop().create_task(_run_worker())
+
+
+async def stop_expiry_worker():
+    global _worker
+    if _running_here():
+        _worker.cancel()
+        await asyncio.gather(_worker, return_exceptions=True)
+    _worker = None
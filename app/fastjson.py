@@ -0,0 +1,156 @@
+import datetime
+import enum
+import json
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import Numeric, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import settings
+from .loading import EMPLOYEE_INCLUDES, parse_include
+from .models import models
+from .schemas import schemas
+
+try:
+    import orjson
+except ImportError:  # optional: the stdlib fallback produces the same JSON, just slower
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+class RowEncoder:
+    """Turns plain column rows into the dicts a response schema would produce.
+
+    Keys follow the schema's field order and values get the schema's JSON types
+    (Numeric columns become floats, enums their values), so the output matches
+    the response_model path without building a model per row.
+    """
+
+    def __init__(self, schema, table):
+        self.fields = list(schema.model_fields)
+        self.columns = [table.c[name] for name in self.fields if name in table.c]
+        self._floats = {column.key for column in self.columns if isinstance(column.type, Numeric)}
+
+    def select_columns(self, fields: Optional[List[str]] = None) -> list:
+        if fields is None:
+            return list(self.columns)
+        return [column for column in self.columns if column.key in fields]
+
+    def project(self, query, fields: Optional[List[str]] = None, required: Sequence = ()):
+        """Swap the selected entity of ``query`` for plain columns, keeping filters and order.
+
+        ``required`` columns (the primary key, a keyset sort column) are selected
+        even when ``fields`` leaves them out of the output.
+        """
+        columns = self.select_columns(fields)
+        keys = {column.key for column in columns}
+        columns += [column for column in required if column.key not in keys]
+        return query.with_only_columns(*columns, maintain_column_froms=True)
+
+    def encode(self, row, fields: Optional[List[str]] = None, **extra) -> dict:
+        values = row._mapping
+        item = {}
+        for name in fields or self.fields:
+            if name in extra:
+                item[name] = extra[name]
+                continue
+            value = values[name]
+            if name in self._floats and value is not None:
+                value = float(value)
+            elif isinstance(value, enum.Enum):
+                value = value.value
+            item[name] = value
+        return item
+
+
+EMPLOYEE = RowEncoder(schemas.Employee, models.Employee.__table__)
+EMPLOYEE_DOCUMENT = RowEncoder(schemas.EmployeeDocument, models.EmployeeDocument.__table__)
+
+
+DEPARTMENT = RowEncoder(schemas.Department, models.Department.__table__)
+POSITION = RowEncoder(schemas.Position, models.Position.__table__)
+
+
+def employee_columns(query, fields: Optional[List[str]] = None, required: Sequence = ()):
+    return EMPLOYEE.project(query, fields, required)
+
+
+async def employee_items(
+    db: AsyncSession,
+    rows: Sequence,
+    include: Optional[str],
+    fields: Optional[List[str]] = None
+) -> List[dict]:
+    documents: Dict[int, list] = defaultdict(list)
+    wanted = fields is None or "documents" in fields
+    if "documents" in parse_include(include, EMPLOYEE_INCLUDES) and wanted and rows:
+        document_table = models.EmployeeDocument.__table__
+        ids = [row.employee_id for row in rows]
+        result = await db.execute(
+            select(*EMPLOYEE_DOCUMENT.columns).where(document_table.c.employee_id.in_(ids)).order_by(document_table.c.document_id)
+        )
+        for document in result:
+            documents[document.employee_id].append(EMPLOYEE_DOCUMENT.encode(document))
+    return [EMPLOYEE.encode(row, fields, documents=documents.get(row.employee_id, [])) for row in rows]
+
+
+def fields_param():
+    return Query(
+        None,
+        description="Comma-separated employee fields to return, e.g. employee_id,first_name,last_name,email. "
+                    "Only those columns are selected; documents still needs include=documents",
+    )
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Validate ?fields=...; returns them in response-schema order, or None for the full object."""
+    requested = {part.strip() for part in (fields or "").split(",") if part.strip()}
+    if not requested:
+        return None
+    unknown = requested - set(EMPLOYEE.fields)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown field: {', '.join(sorted(unknown))}. Allowed: {', '.join(EMPLOYEE.fields)}"
+        )
+    return [name for name in EMPLOYEE.fields if name in requested]
+
+
+def fast_json_param():
+    return Query(
+        None,
+        description="Serialize straight from column rows (skips per-row model validation; same JSON). "
+                    "Defaults to the server setting for this endpoint",
+    )
+
+
+def use_fast_json(endpoint: str, requested: Optional[bool]) -> bool:
+    if requested is not None:
+        return requested
+    enabled: Iterable[str] = (name.strip() for name in settings.FAST_JSON_ENDPOINTS.split(","))
+    return any(name in ("*", endpoint) for name in enabled)
@@ -0,0 +1,179 @@
+import asyncio
+import hashlib
+import hmac
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from passlib.context import CryptContext
+
+from .config import settings
+from .metrics import metrics
+
+
+@lru_cache(maxsize=None)
+def _context(rounds: int) -> CryptContext:
+    # min == max rounds: any hash made under a different work factor reports needs_update
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds,
+    )
+
+
+# Worker entry points: module-level so they pickle into the process pool, and
+# configured through arguments so workers do not depend on parent state
+def _hash(password: str, rounds: int) -> str:
+    return _context(rounds).hash(password)
+
+def _verify_and_update(password: str, hashed: str, rounds: int) -> Tuple[bool, Optional[str]]:
+    return _context(rounds).verify_and_update(password, hashed)
+
+def _warm(rounds: int) -> None:
+    _context(rounds)
+
+
+class VerifiedCredentialCache:
+    """Short-lived LRU of successful verifications.
+
+    Keys are an HMAC of (username, password, stored hash) under a per-process
+    random key, so plaintext never sits in memory and a password change
+    (new stored hash) misses the cache automatically. Failures are never cached.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._key = os.urandom(32)
+        self._entries: "OrderedDict[bytes, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl > 0
+
+    def _digest(self, username: str, password: str, hashed: str) -> bytes:
+        message = "\0".join((username, password, hashed)).encode()
+        return hmac.new(self._key, message, hashlib.sha256).digest()
+
+    def hit(self, username: str, password: str, hashed: str) -> bool:
+        if not self.enabled:
+            return False
+        digest = self._digest(username, password, hashed)
+        with self._lock:
+            expires = self._entries.get(digest)
+            if expires is None:
+                return False
+            if expires < time.monotonic():
+                del self._entries[digest]
+                return False
+            self._entries.move_to_end(digest)
+            return True
+
+    def add(self, username: str, password: str, hashed: str):
+        if not self.enabled:
+            return
+        digest = self._digest(username, password, hashed)
+        with self._lock:
+            self._entries[digest] = time.monotonic() + self.ttl
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+verified_cache = VerifiedCredentialCache(settings.VERIFY_CACHE_SIZE, settings.VERIFY_CACHE_TTL)
+
+_executor: Optional[Executor] = None
+_executor_lock = threading.Lock()
+_slots: Optional[asyncio.Semaphore] = None
+
+
+def _get_executor() -> Optional[Executor]:
+    global _executor
+    if settings.HASH_WORKERS <= 0:
+        return None
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=settings.HASH_WORKERS)
+        return _executor
+
+
+def shutdown_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+async def prewarm_executor():
+    """Start the hashing workers now rather than on the first login."""
+    executor = _get_executor()
+    if executor is None:
+        _warm(settings.BCRYPT_ROUNDS)
+        return
+    loop = asyncio.get_running_loop()
+    await asyncio.gather(*(loop.run_in_executor(executor, _warm, settings.BCRYPT_ROUNDS) for _ in range(settings.HASH_WORKERS)))
+
+
+async def _run(fn, *args):
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(settings.HASH_MAX_PENDING)
+    # Backpressure: beyond HASH_MAX_PENDING queued hashes, shed load instead of piling up latency
+    try:
+        await asyncio.wait_for(_slots.acquire(), timeout=settings.HASH_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication service is busy, please retry",
+            headers={"Retry-After": "1"},
+        )
+    start = time.perf_counter()
+    try:
+        executor = _get_executor()
+        if executor is None:
+            return await run_in_threadpool(fn, *args)
+        return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+    finally:
+        _slots.release()
+        metrics.observe_operation("password_hash", time.perf_counter() - start)
+
+
+async def get_password_hash(password: str) -> str:
+    return await _run(_hash, password, settings.BCRYPT_ROUNDS)
+
+
+def hash_password(password: str) -> str:
+    """Hash at the configured cost in the calling thread, for scripts that run outside the event loop."""
+    return _hash(password, settings.BCRYPT_ROUNDS)
+
+
+async def verify_password(username: str, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    """Check a password off the event loop.
+
+    Returns ``(verified, new_hash)``; ``new_hash`` is set when the stored hash was
+    made with a different work factor and should be replaced.
+    """
+    context = _context(settings.BCRYPT_ROUNDS)
+    if verified_cache.hit(username, password, hashed):
+        if context.needs_update(hashed):
+            return True, await get_password_hash(password)
+        return True, None
+
+    verified, new_hash = await _run(_verify_and_update, password, hashed, settings.BCRYPT_ROUNDS)
+    if verified:
+        verified_cache.add(username, password, new_hash or hashed)
+    return verified, new_hash
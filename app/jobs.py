@@ -0,0 +1,67 @@
+import asyncio
+import contextvars
+import logging
+from datetime import datetime
+from typing import Awaitable, Callable, Optional, Set
+from uuid import uuid4
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .database import AsyncSessionLocal
+from .models import models
+
+logger = logging.getLogger(__name__)
+
+# The event loop only keeps weak references to tasks; hold them until they finish
+_tasks: Set[asyncio.Task] = set()
+
+
+def spawn(coro: Awaitable) -> asyncio.Task:
+    """Run ``coro`` in the background, detached from the caller.
+
+    The task starts from an empty context rather than a copy of the request's, so
+    its queries are not charged to that request's query log, budget or metrics.
+    """
+    task = contextvars.Context().run(asyncio.get_running_loop().create_task, coro)
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return task
+
+
+async def _update(job_id: str, **values):
+    async with AsyncSessionLocal() as session:
+        await session.execute(update(models.BackgroundJob).where(models.BackgroundJob.id == job_id).values(**values))
+        await session.commit()
+
+
+async def _run(job_id: str, runner: Callable[[], Awaitable[dict]]):
+    try:
+        await _update(job_id, status="running")
+        result = await runner()
+    except Exception as e:
+        logger.exception("Background job %s failed", job_id)
+        final = {"status": "failed", "error": str(e)}
+    else:
+        final = {"status": "succeeded", "result": result}
+    try:
+        await _update(job_id, finished_at=datetime.utcnow(), **final)
+    except Exception:
+        # Nothing else will finish the record; the log is the only trace of the outcome
+        logger.exception("Could not record the %s status of background job %s", final["status"], job_id)
+
+
+async def start_job(db: AsyncSession, kind: str, params: dict, runner: Callable[[], Awaitable[dict]]) -> models.BackgroundJob:
+    """Record a job and run ``runner`` in the background; its return value becomes the job result.
+
+    Runners must open their own sessions: ``db`` belongs to the request that started the job.
+    """
+    job = models.BackgroundJob(id=uuid4().hex, kind=kind, status="pending", params=params, created_at=datetime.utcnow())
+    db.add(job)
+    await db.commit()
+    spawn(_run(job.id, runner))
+    return job
+
+
+async def get_job(db: AsyncSession, job_id: str) -> Optional[models.BackgroundJob]:
+    return await db.scalar(select(models.BackgroundJob).where(models.BackgroundJob.id == job_id))
@@ -0,0 +1,49 @@
+from typing import Dict, List, Optional, Set
+
+from fastapi import HTTPException, Query
+from sqlalchemy.orm import noload, selectinload
+
+from .models import models
+
+# Relations a client may embed via ?include=..., mapped to batch loader options.
+# Anything not requested is switched to noload so serialization never lazy-loads per row.
+EMPLOYEE_INCLUDES: Dict[str, List] = {
+    "documents": [selectinload(models.Employee.documents)],
+}
+
+DOCUMENT_INCLUDES: Dict[str, List] = {
+    "employee": [selectinload(models.Document.employee).noload(models.Employee.documents)],
+    "employee.documents": [selectinload(models.Document.employee).selectinload(models.Employee.documents)],
+}
+
+
+def include_param(example: str):
+    return Query(None, description=f"Comma-separated relations to embed, e.g. {example}")
+
+
+def parse_include(include: Optional[str], allowed: Dict[str, List]) -> Set[str]:
+    requested = {part.strip() for part in (include or "").split(",") if part.strip()}
+    unknown = requested - allowed.keys()
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown include: {', '.join(sorted(unknown))}. Allowed: {', '.join(sorted(allowed))}"
+        )
+    return requested
+
+
+def employee_options(include: Optional[str]) -> List:
+    requested = parse_include(include, EMPLOYEE_INCLUDES)
+    if "documents" in requested:
+        return list(EMPLOYEE_INCLUDES["documents"])
+    return [noload(models.Employee.documents)]
+
+
+def document_options(include: Optional[str]) -> List:
+    requested = parse_include(include, DOCUMENT_INCLUDES)
+    # The deeper include already covers the shallower one
+    if "employee.documents" in requested:
+        return list(DOCUMENT_INCLUDES["employee.documents"])
+    if "employee" in requested:
+        return list(DOCUMENT_INCLUDES["employee"])
+    return [noload(models.Document.employee)]
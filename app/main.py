@@ -1,20 +1,29 @@
 import logging
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, Request, Response
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from .routes.router import router as user_router
-from .routes.hr_router import router as hr_router
-from .database import init_db
+from .routes.hr_router import router as hr_router, upload_router
+from .routes.bulk_router import router as bulk_router
+from .routes.analytics_router import router as analytics_router
+from .database import pool_status, async_engine
+from .startup import lifespan, readiness
+from .pagination import NEXT_CURSOR_HEADER
+from .cache import response_cache
+from .metrics import metrics, MetricsMiddleware, instrument_engine
+from .querylog import QueryBudgetExceeded
+from .auth import auth_gate
+from .compression import CompressionMiddleware
+from .config import settings
 from .models import models
 
-# Initialize database (creates tables if they don't exist)
-init_db()
-
 app = FastAPI(
     title="HR Management System",
     description="System for managing employee data and HR processes",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -24,12 +33,58 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allows all methods
     allow_headers=["*"],  # Allows all headers
+    expose_headers=[NEXT_CURSOR_HEADER],  # Lets the frontend read the keyset pagination cursor
 )
 
+# Added before the metrics middleware, so metrics time the compressed response
+if settings.COMPRESSION_MINIMUM_SIZE > 0:
+    app.add_middleware(CompressionMiddleware)
+
+if metrics.enabled:
+    # Outermost, so latency covers the other middleware and the whole response body
+    app.add_middleware(MetricsMiddleware)
+    instrument_engine(async_engine.sync_engine)
+
+    @app.get("/metrics", include_in_schema=False)
+    def metrics_endpoint():
+        return metrics.render()
+
+@app.exception_handler(QueryBudgetExceeded)
+async def query_budget_exceeded(request: Request, exc: QueryBudgetExceeded):
+    # Only raised with QUERY_BUDGET_ENFORCE; the report names every statement the request issued
+    return JSONResponse(status_code=500, content={"detail": str(exc), "report": exc.report})
+
 # Include routers
+# auth_gate only checks the bearer token when AUTH_REQUIRED is set
 app.include_router(user_router, tags=["Users"])
-app.include_router(hr_router)
+app.include_router(hr_router, dependencies=[Depends(auth_gate)])
+app.include_router(upload_router, dependencies=[Depends(auth_gate)])
+app.include_router(bulk_router, dependencies=[Depends(auth_gate)])
+app.include_router(analytics_router, dependencies=[Depends(auth_gate)])
 
 @app.get("/")
 def read_root():
-    return {"message": "Welcome to the API"}
\ No newline at end of file
+    return {"message": "Welcome to the API"}
+
+@app.get("/health/live", tags=["Health"])
+def liveness():
+    # The process is up and serving; says nothing about the database
+    return {"status": "alive"}
+
+@app.get("/health/ready", tags=["Health"])
+async def readiness_check(response: Response):
+    # 503 until startup (migrations, pool and cache pre-warm) is done, or while the database is unreachable
+    report = await readiness()
+    if not report["ready"]:
+        response.status_code = 503
+    return report
+
+@app.get("/health/db-pool", tags=["Health"])
+def db_pool_status():
+    # Live pool occupancy plus cumulative checkout/wait counters for sizing workers against the DB
+    return pool_status()
+
+@app.get("/health/cache", tags=["Health"])
+def cache_status():
+    # Per-namespace hits, misses, invalidations and hit rate for the department/position cache
+    return response_cache.snapshot()
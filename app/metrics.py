@@ -0,0 +1,195 @@
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from fastapi import Response
+
+from .config import settings
+
+try:
+    from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+    from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+except ImportError:  # optional dependency, only needed for METRICS_ENABLED
+    CollectorRegistry = None
+
+UNMATCHED_ROUTE = "<unmatched>"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+
+class RequestStats:
+    """DB work done on behalf of one request, filled in by the engine hooks."""
+
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_stats() -> Optional[RequestStats]:
+    return _current.get()
+
+
+class _StatusCollector:
+    """Pool and cache gauges read at scrape time, so requests never pay for them."""
+
+    def collect(self):
+        from .cache import response_cache
+        from .database import pool_status
+
+        pool = GaugeMetricFamily("hr_db_pool_connections", "Connection pool occupancy", labels=["state"])
+        status = pool_status()
+        for state in ("size", "checkedin", "checkedout", "overflow"):
+            if state in status:
+                pool.add_metric([state], status[state])
+        yield pool
+        for name in ("checkouts", "connects", "invalidations", "waits", "timeouts"):
+            yield CounterMetricFamily(f"hr_db_pool_{name}", f"Connection pool {name}", value=status[name])
+        yield CounterMetricFamily(
+            "hr_db_pool_wait_seconds", "Time spent waiting for a pooled connection", value=status["wait_seconds_total"]
+        )
+
+        cache = response_cache.snapshot()
+        lookups = CounterMetricFamily("hr_cache_lookups", "Response cache lookups", labels=["namespace", "result"])
+        invalidations = CounterMetricFamily("hr_cache_invalidations", "Response cache invalidations", labels=["namespace"])
+        hit_rate = GaugeMetricFamily("hr_cache_hit_rate", "Response cache hit rate", labels=["namespace"])
+        for namespace, counts in cache["namespaces"].items():
+            lookups.add_metric([namespace, "hit"], counts["hits"])
+            lookups.add_metric([namespace, "miss"], counts["misses"])
+            invalidations.add_metric([namespace], counts["invalidations"])
+            hit_rate.add_metric([namespace], counts["hit_rate"])
+        yield lookups
+        yield invalidations
+        yield hit_rate
+
+
+class Metrics:
+    def __init__(self):
+        self.enabled = False
+
+    def configure(self):
+        self.enabled = settings.METRICS_ENABLED
+        if not self.enabled:
+            return
+        if CollectorRegistry is None:
+            raise RuntimeError("METRICS_ENABLED requires the 'prometheus_client' package")
+        # Own registry: only this app's series, and re-configuring never hits duplicate registration
+        self.registry = CollectorRegistry()
+        self.requests = Counter(
+            "hr_http_requests", "HTTP requests", ["method", "route", "status"], registry=self.registry
+        )
+        self.latency = Histogram(
+            "hr_http_request_duration_seconds", "Time to the end of the response body", ["method", "route"],
+            buckets=LATENCY_BUCKETS, registry=self.registry
+        )
+        self.in_progress = Gauge(
+            "hr_http_requests_in_progress", "Requests being handled", ["method"], registry=self.registry
+        )
+        self.request_queries = Histogram(
+            "hr_db_queries_per_request", "SQL statements issued per request", ["route"],
+            buckets=QUERY_COUNT_BUCKETS, registry=self.registry
+        )
+        self.request_db_time = Histogram(
+            "hr_db_seconds_per_request", "Time spent in SQL statements per request", ["route"],
+            buckets=LATENCY_BUCKETS, registry=self.registry
+        )
+        self.query_latency = Histogram(
+            "hr_db_query_duration_seconds", "Duration of a single SQL statement",
+            buckets=LATENCY_BUCKETS, registry=self.registry
+        )
+        self.operation_latency = Histogram(
+            "hr_operation_duration_seconds", "Time spent in expensive non-DB steps", ["operation"],
+            buckets=LATENCY_BUCKETS, registry=self.registry
+        )
+        self.upload_bytes = Counter("hr_upload_bytes", "Bytes received by document uploads", registry=self.registry)
+        self.uploads = Counter("hr_uploads", "Document uploads stored", registry=self.registry)
+        self.registry.register(_StatusCollector())
+
+    def observe_query(self, seconds: float):
+        self.query_latency.observe(seconds)
+        stats = _current.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += seconds
+
+    def observe_operation(self, operation: str, seconds: float):
+        if self.enabled:
+            self.operation_latency.labels(operation).observe(seconds)
+
+    def observe_upload(self, size: int):
+        if self.enabled:
+            self.uploads.inc()
+            self.upload_bytes.inc(size)
+
+    def render(self) -> Response:
+        return Response(content=generate_latest(self.registry), media_type=CONTENT_TYPE_LATEST)
+
+
+metrics = Metrics()
+metrics.configure()
+
+
+def _route_template(scope) -> str:
+    # The path template, not the raw path, so /hr/employees/1 and /hr/employees/2 share a series
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """Plain ASGI middleware: times the whole response and collects the request's DB stats."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        metrics.in_progress.labels(method).inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            _current.reset(token)
+            metrics.in_progress.labels(method).dec()
+            route = _route_template(scope)
+            metrics.requests.labels(method, route, str(status_code)).inc()
+            metrics.latency.labels(method, route).observe(elapsed)
+            metrics.request_queries.labels(route).observe(stats.queries)
+            metrics.request_db_time.labels(route).observe(stats.db_seconds)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._metrics_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_metrics_start", None)
+    if start is not None:
+        metrics.observe_query(time.perf_counter() - start)
+
+
+def instrument_engine(engine):
+    """Time every statement on ``engine``; a no-op when metrics are off so queries pay nothing."""
+    if not metrics.enabled:
+        return
+    from sqlalchemy import event
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
@@ -0,0 +1,78 @@
+import argparse
+import logging
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import inspect, text
+
+logger = logging.getLogger(__name__)
+
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+# Revision matching the tables create_all built before migrations existed
+BASELINE_REVISION = "0001"
+# Arbitrary constant key; serializes startup migrations across workers on Postgres
+MIGRATION_LOCK_ID = 72410301
+
+
+def _config(connection=None) -> Config:
+    config = Config(str(ALEMBIC_INI))
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+
+def head_revision() -> str:
+    return ScriptDirectory.from_config(_config()).get_current_head()
+
+
+def current_revision(connection):
+    return MigrationContext.configure(connection).get_current_revision()
+
+
+def upgrade_database(engine, revision: str = "head"):
+    """Bring the schema up to ``revision``.
+
+    Databases created by create_all before migrations existed have the tables
+    but no alembic_version row; they are stamped at the baseline first, and the
+    later revisions only add what is missing.
+    """
+    with engine.begin() as connection:
+        if connection.dialect.name == "postgresql":
+            connection.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+        config = _config(connection)
+        tables = set(inspect(connection).get_table_names())
+        if "alembic_version" not in tables and "employees" in tables:
+            logger.info("Stamping pre-migration database at %s", BASELINE_REVISION)
+            command.stamp(config, BASELINE_REVISION)
+        command.upgrade(config, revision)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.migrations", description="Manage the database schema")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    upgrade = subcommands.add_parser("upgrade", help="apply migrations (default: up to head)")
+    upgrade.add_argument("revision", nargs="?", default="head")
+    downgrade = subcommands.add_parser("downgrade", help="revert to an earlier revision")
+    downgrade.add_argument("revision")
+    subcommands.add_parser("current", help="show the applied and the latest revision")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+    from .database import engine
+    if args.command == "upgrade":
+        upgrade_database(engine, args.revision)
+        from .search import ensure_search_indexes
+        ensure_search_indexes(engine)
+    elif args.command == "downgrade":
+        with engine.begin() as connection:
+            command.downgrade(_config(connection), args.revision)
+    else:
+        with engine.connect() as connection:
+            print(f"current: {current_revision(connection)}  head: {head_revision()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Date, Float, Enum, Text, Boolean, Numeric, LargeBinary
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, ForeignKey, Date, Float, Enum, Text, Boolean, Numeric, LargeBinary, Index, JSON, text
 from sqlalchemy.orm import relationship
 from ..database import Base
 from datetime import datetime
@@ -60,7 +60,7 @@ class Position(Base):
     
     position_id = Column(Integer, primary_key=True, index=True)  # Changed from designation_id
     title = Column(String(100), nullable=False)
-    department_id = Column(Integer, ForeignKey("departments.department_id"))
+    department_id = Column(Integer, ForeignKey("departments.department_id"), index=True)
     description = Column(Text)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -72,13 +72,24 @@ class EmployeeDocument(Base):
     __tablename__ = "employee_documents"
     
     document_id = Column(Integer, primary_key=True, index=True)
-    employee_id = Column(Integer, ForeignKey("employees.employee_id"))
+    employee_id = Column(Integer, ForeignKey("employees.employee_id"), index=True)
     document_type = Column(String(50), nullable=False)
     document_path = Column(String(255), nullable=False)
+    content_hash = Column(String(64), index=True)  # SHA-256 of the stored blob; NULL for legacy uploads
+    size_bytes = Column(BigInteger)
+    original_filename = Column(String(255))
+    content_type = Column(String(100))
     uploaded_at = Column(DateTime, default=datetime.utcnow)
     
     employee = relationship("Employee", back_populates="documents")
 
+    __table_args__ = (
+        Index(
+            "ix_employee_documents_employee_type_hash", "employee_id", "document_type", "content_hash",
+            postgresql_where=text("content_hash IS NOT NULL"), sqlite_where=text("content_hash IS NOT NULL")
+        ),
+    )
+
 class Employee(Base):
     __tablename__ = "employees"
     
@@ -95,7 +106,7 @@ class Employee(Base):
     employment_type = Column(Enum(EmploymentType))
     work_type = Column(Enum(WorkType))
     department_id = Column(Integer, ForeignKey("departments.department_id"))
-    position_id = Column(Integer, ForeignKey("positions.position_id"))  # Updated to match new column name
+    position_id = Column(Integer, ForeignKey("positions.position_id"), index=True)  # Updated to match new column name
     working_days = Column(String(20))
     join_date = Column(Date)
     ctc = Column(Numeric(12, 2))
@@ -110,6 +121,17 @@ class Employee(Base):
     documents = relationship("EmployeeDocument", back_populates="employee", cascade="all, delete")  # Changed from Document to EmployeeDocument
     # Removed designation relationship
 
+    # Keep in sync with migrations/versions; employee_id closes each index for keyset pagination
+    __table_args__ = (
+        Index("ix_employees_status_department_last_name", "status", "department_id", "last_name", "employee_id"),
+        Index("ix_employees_department_last_name", "department_id", "last_name", "employee_id"),
+        Index("ix_employees_last_name_employee_id", "last_name", "employee_id"),
+        Index(
+            "ix_employees_active_last_name", "last_name", "employee_id",
+            postgresql_where=text("status = 'active'"), sqlite_where=text("status = 'active'")
+        ),
+    )
+
 # Optional: If you're not using the Document model, you can remove it
 # If you are using it, update its relationship
 class Document(Base):
@@ -120,8 +142,76 @@ class Document(Base):
     type = Column(String, nullable=False)  # passport, contract, certificate, etc.
     number = Column(String)
     issue_date = Column(Date)
-    expiry_date = Column(Date)
-    employee_id = Column(Integer, ForeignKey("employees.employee_id"))
+    expiry_date = Column(Date, index=True)  # range scans by the expiry scanner
+    employee_id = Column(Integer, ForeignKey("employees.employee_id"), index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     
-    employee = relationship("Employee")  # Remove back_populates here
\ No newline at end of file
+    employee = relationship("Employee")  # Remove back_populates here
+
+
+class EmployeeSummary(Base):
+    """Pre-aggregated employee counts and payroll per (department, status).
+
+    Rebuilt wholesale by app.analytics.refresh_summary, so there is no foreign
+    key; dashboards read this instead of grouping the employees table.
+    """
+    __tablename__ = "employee_summary"
+
+    id = Column(Integer, primary_key=True)
+    department_id = Column(Integer, index=True)  # NULL for employees without a department
+    status = Column(Enum(EmployeeStatus))
+    headcount = Column(Integer, nullable=False)
+    ctc_count = Column(Integer, nullable=False)  # employees with a ctc, for averages
+    ctc_total = Column(Numeric(16, 2), nullable=False)
+    monthly_salary_count = Column(Integer, nullable=False)
+    monthly_salary_total = Column(Numeric(16, 2), nullable=False)
+    refreshed_at = Column(DateTime, nullable=False)
+
+class BackgroundJob(Base):
+    """Long-running operations started by a request and polled via GET /hr/jobs/{id}.
+
+    Stored in the database so any worker can answer the poll.
+    """
+    __tablename__ = "background_jobs"
+
+    id = Column(String(32), primary_key=True)
+    kind = Column(String(50), nullable=False)
+    status = Column(String(20), nullable=False, default="pending")  # pending, running, succeeded, failed
+    params = Column(JSON)
+    result = Column(JSON)
+    error = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime)
+
+class RevokedToken(Base):
+    """Access tokens withdrawn before their expiry (logout), by JWT id.
+
+    Workers keep the unexpired ids in memory and poll for new rows, so checking
+    a token never queries this table.
+    """
+    __tablename__ = "revoked_tokens"
+
+    jti = Column(String(64), primary_key=True)
+    expires_at = Column(DateTime, nullable=False)  # rows are useless after this and get pruned
+    revoked_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+class ExpiringDocument(Base):
+    """Documents expiring within DOCUMENT_EXPIRY_WINDOW_DAYS (or already expired).
+
+    Rebuilt by app.expiry from one indexed range query on documents.expiry_date;
+    like employee_summary it has no foreign keys and is replaced wholesale.
+    """
+    __tablename__ = "expiring_documents"
+
+    document_id = Column(Integer, primary_key=True)
+    employee_id = Column(Integer, index=True)
+    title = Column(String, nullable=False)
+    type = Column(String, nullable=False)
+    number = Column(String)
+    expiry_date = Column(Date, nullable=False)
+    scanned_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        # Listing order and keyset cursor of GET /hr/documents/expiring
+        Index("ix_expiring_documents_expiry_date_document_id", "expiry_date", "document_id"),
+    )
@@ -0,0 +1,138 @@
+import base64
+import binascii
+import enum
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, List, Optional, Tuple
+
+from fastapi import HTTPException, Response
+from sqlalchemy import and_, or_, tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _dump_value(value: Any) -> Any:
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _load_value(column, value: Any) -> Any:
+    if value is None:
+        return None
+    python_type = column.type.python_type
+    if issubclass(python_type, enum.Enum):
+        return python_type(value)
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    if python_type is Decimal:
+        return Decimal(value)
+    return value
+
+
+def encode_cursor(sort_key: str, desc: bool, value: Any, pk: Any) -> str:
+    payload = json.dumps({"k": sort_key, "d": desc, "v": _dump_value(value), "id": pk}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_key: str, desc: bool) -> dict:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    # A cursor is only meaningful for the ordering it was issued for
+    if not isinstance(payload, dict) or payload.get("k") != sort_key or payload.get("d") != desc or "id" not in payload:
+        raise HTTPException(status_code=400, detail="Cursor does not match the requested ordering")
+    return payload
+
+
+class Keyset:
+    """Seek pagination over ``(sort column, primary key)``.
+
+    Rows are ordered by the sort column with the primary key as a tie-breaker,
+    and a cursor carries the last row's values so the next page starts with an
+    index range scan instead of an OFFSET that discards every skipped row.
+    """
+
+    def __init__(self, sort_column, pk_column, desc: bool = False):
+        self.sort_column = sort_column
+        self.pk_column = pk_column
+        self.desc = desc
+        self.same_column = sort_column.key == pk_column.key
+
+    @property
+    def sort_key(self) -> str:
+        return self.sort_column.key
+
+    def order_by(self) -> List:
+        if self.same_column:
+            return [self.pk_column.desc() if self.desc else self.pk_column.asc()]
+        sort = self.sort_column.desc() if self.desc else self.sort_column.asc()
+        if self.sort_column.nullable:
+            # Pin NULL placement so the seek predicate below agrees with the ordering
+            sort = sort.nulls_last()
+        pk = self.pk_column.desc() if self.desc else self.pk_column.asc()
+        return [sort, pk]
+
+    def seek(self, cursor: str):
+        payload = decode_cursor(cursor, self.sort_key, self.desc)
+        pk = payload["id"]
+        if self.same_column:
+            return self.pk_column < pk if self.desc else self.pk_column > pk
+
+        value = _load_value(self.sort_column, payload.get("v"))
+        col, pk_col = self.sort_column, self.pk_column
+        after_pk = pk_col < pk if self.desc else pk_col > pk
+        if not self.sort_column.nullable:
+            # Row-value comparison lets Postgres use a composite index directly
+            if self.desc:
+                return tuple_(col, pk_col) < (value, pk)
+            return tuple_(col, pk_col) > (value, pk)
+        if value is None:
+            return and_(col.is_(None), after_pk)
+        after_value = col < value if self.desc else col > value
+        return or_(after_value, and_(col == value, after_pk), col.is_(None))
+
+    def next_cursor(self, row) -> str:
+        return encode_cursor(
+            self.sort_key,
+            self.desc,
+            getattr(row, self.sort_column.key),
+            getattr(row, self.pk_column.key),
+        )
+
+
+def paginate(query, keyset: Keyset, cursor: Optional[str], skip: int, limit: int):
+    """Apply keyset ordering plus either the cursor seek or a plain offset.
+
+    One extra row is requested so the caller can tell whether a next page exists.
+    """
+    query = query.order_by(*keyset.order_by())
+    if cursor:
+        query = query.filter(keyset.seek(cursor))
+    elif skip:
+        query = query.offset(skip)
+    return query.limit(limit + 1)
+
+
+def split_page(rows: list, keyset: Keyset, limit: int) -> Tuple[list, Optional[str]]:
+    """Trim the lookahead row; returns the page and the next cursor (None on the last page)."""
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, keyset.next_cursor(rows[-1])
+    return rows, None
+
+
+def page_rows(rows: list, keyset: Keyset, limit: int, response: Response) -> list:
+    rows, next_cursor = split_page(rows, keyset, limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return rows
@@ -0,0 +1,159 @@
+import logging
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+import anyio
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .analytics import schedule_summary_refresh
+from .cache import response_cache
+from .database import AsyncSessionLocal
+from .jobs import spawn
+from .models import models
+from .storage import blob_lock, remove_files
+
+logger = logging.getLogger(__name__)
+
+PURGE_BATCH_SIZE = 1000
+# Keeps IN lists well below driver bind-parameter limits
+REFERENCE_CHECK_CHUNK = 1000
+# Blobs locked at once; each is an entry in Postgres' shared lock table until the chunk commits
+BLOB_LOCK_CHUNK = 64
+
+StoredFile = Tuple[str, Optional[str]]  # (document_path, content_hash)
+
+
+def _bulk(statement):
+    # Nothing from these tables is loaded in the session, so skip ORM synchronization
+    return statement.execution_options(synchronize_session=False)
+
+
+async def _purge_employees(session: AsyncSession, employee_ids, totals: Counter, files: List[StoredFile]):
+    document = models.EmployeeDocument
+    deleted = await session.execute(_bulk(
+        delete(document).where(document.employee_id.in_(employee_ids))
+        .returning(document.document_path, document.content_hash)
+    ))
+    rows = deleted.all()
+    files.extend((row.document_path, row.content_hash) for row in rows)
+    totals["employee_documents"] += len(rows)
+    totals["documents"] += (await session.execute(_bulk(
+        delete(models.Document).where(models.Document.employee_id.in_(employee_ids))
+    ))).rowcount
+    await session.execute(_bulk(
+        delete(models.ExpiringDocument).where(models.ExpiringDocument.employee_id.in_(employee_ids))
+    ))
+    totals["employees"] += (await session.execute(_bulk(
+        delete(models.Employee).where(models.Employee.employee_id.in_(employee_ids))
+    ))).rowcount
+
+
+async def purge_employee(session: AsyncSession, employee_id: int) -> Tuple[bool, List[StoredFile]]:
+    """Delete one employee with their uploads and documents; returns (found, files)."""
+    totals: Counter = Counter()
+    files: List[StoredFile] = []
+    await _purge_employees(session, [employee_id], totals, files)
+    await session.commit()
+    return totals["employees"] > 0, files
+
+
+async def purge_department(session: AsyncSession, department_id: int, batch_size: Optional[int] = None) -> Tuple[Counter, List[StoredFile]]:
+    """Delete a department and everything under it with set-based statements.
+
+    Without ``batch_size`` it is one transaction of a handful of DELETEs. With it,
+    employees are removed ``batch_size`` at a time, committing in between so a huge
+    department never holds locks for long; the department row goes last.
+    Employees of other departments that hold one of its positions keep their
+    record with position_id cleared.
+    """
+    totals: Counter = Counter()
+    files: List[StoredFile] = []
+    in_department = select(models.Employee.employee_id).where(models.Employee.department_id == department_id)
+
+    if batch_size:
+        while True:
+            employee_ids = (await session.scalars(in_department.limit(batch_size))).all()
+            if not employee_ids:
+                break
+            await _purge_employees(session, employee_ids, totals, files)
+            await session.commit()
+    else:
+        await _purge_employees(session, in_department, totals, files)
+
+    positions = select(models.Position.position_id).where(models.Position.department_id == department_id)
+    totals["reassigned_employees"] += (await session.execute(_bulk(
+        update(models.Employee).where(models.Employee.position_id.in_(positions)).values(position_id=None)
+    ))).rowcount
+    totals["positions"] += (await session.execute(_bulk(
+        delete(models.Position).where(models.Position.department_id == department_id)
+    ))).rowcount
+    await session.execute(_bulk(delete(models.Department).where(models.Department.department_id == department_id)))
+    await session.commit()
+    return totals, files
+
+
+async def remove_orphaned_files(files: List[StoredFile]) -> int:
+    """Delete files no remaining document row points at.
+
+    Blobs are shared by content hash and legacy files could be overwritten in
+    place, so each one is checked against what is still in employee_documents.
+    Blobs are checked and removed under blob_lock, so an upload deduplicating
+    onto one at the same moment either keeps it or restores it.
+    """
+    document = models.EmployeeDocument
+    blob_paths: Dict[str, Set[str]] = defaultdict(set)
+    for path, content_hash in files:
+        if content_hash:
+            blob_paths[content_hash].add(path)
+    hashes = sorted(blob_paths)
+    legacy_paths = sorted({path for path, content_hash in files if not content_hash})
+    removed = 0
+    async with AsyncSessionLocal() as session:
+        for start in range(0, len(hashes), BLOB_LOCK_CHUNK):
+            chunk = hashes[start:start + BLOB_LOCK_CHUNK]
+            async with blob_lock(session, *chunk):
+                live = set(await session.scalars(select(document.content_hash).where(document.content_hash.in_(chunk)).distinct()))
+                orphans = sorted(path for content_hash in chunk if content_hash not in live for path in blob_paths[content_hash])
+                removed += await anyio.to_thread.run_sync(remove_files, orphans)
+                await session.commit()
+        live_paths: Set[str] = set()
+        for start in range(0, len(legacy_paths), REFERENCE_CHECK_CHUNK):
+            chunk = legacy_paths[start:start + REFERENCE_CHECK_CHUNK]
+            live_paths.update(await session.scalars(select(document.document_path).where(document.document_path.in_(chunk)).distinct()))
+
+    orphans = sorted(path for path in legacy_paths if path not in live_paths)
+    return removed + await anyio.to_thread.run_sync(remove_files, orphans)
+
+
+async def _remove_files_in_background(files: List[StoredFile]):
+    try:
+        removed = await remove_orphaned_files(files)
+        logger.info("Removed %d orphaned upload files", removed)
+    except Exception:
+        logger.exception("Upload file cleanup failed")
+
+
+async def _invalidate_after_purge():
+    await response_cache.invalidate("departments", "positions")
+    schedule_summary_refresh()
+
+
+def release_files(files: List[StoredFile]):
+    """Remove now-unreferenced upload files in the background, after the delete has committed."""
+    if files:
+        spawn(_remove_files_in_background(files))
+
+
+async def department_purged(files: List[StoredFile]):
+    """Follow-up once a purge has committed: caches, analytics and files on disk."""
+    await _invalidate_after_purge()
+    release_files(files)
+
+
+async def purge_department_job(department_id: int) -> dict:
+    async with AsyncSessionLocal() as session:
+        totals, files = await purge_department(session, department_id, batch_size=PURGE_BATCH_SIZE)
+    await _invalidate_after_purge()
+    totals["files_removed"] = await remove_orphaned_files(files) if files else 0
+    return dict(totals)
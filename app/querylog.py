@@ -0,0 +1,176 @@
+import json
+import logging
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import List, Optional
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# Statements worth an EXPLAIN; DDL, transaction control and PRAGMAs are skipped
+EXPLAINABLE = ("select", "insert", "update", "delete", "with")
+EXPLAIN_PREFIX = {"postgresql": "EXPLAIN ", "sqlite": "EXPLAIN QUERY PLAN "}
+
+
+class QueryBudgetExceeded(Exception):
+    def __init__(self, report: dict):
+        super().__init__(f"Query budget exceeded: {', '.join(report['exceeded'])}")
+        self.report = report
+
+
+class QueryRecord:
+    __slots__ = ("statement", "parameters", "duration_ms", "executemany", "plan")
+
+    def __init__(self, statement: str, parameters, duration_ms: float, executemany: bool):
+        self.statement = statement
+        self.parameters = parameters
+        self.duration_ms = duration_ms
+        self.executemany = executemany
+        self.plan: Optional[List[str]] = None
+
+    @property
+    def explainable(self) -> bool:
+        return not self.executemany and self.statement.lstrip().lower().startswith(EXPLAINABLE)
+
+    def as_dict(self) -> dict:
+        record = {
+            "statement": self.statement,
+            "parameters": repr(self.parameters),
+            "duration_ms": round(self.duration_ms, 3),
+        }
+        if self.plan is not None:
+            record["plan"] = self.plan
+        return record
+
+
+class QueryLog:
+    """Every statement one unit of work (usually a request) issued, checked against a budget."""
+
+    def __init__(
+        self,
+        label: str = "",
+        max_queries: Optional[int] = None,
+        max_ms: Optional[float] = None,
+        enforce: Optional[bool] = None,
+        slow_ms: Optional[float] = None
+    ):
+        self.label = label
+        self.max_queries = settings.QUERY_BUDGET_COUNT if max_queries is None else max_queries
+        self.max_ms = settings.QUERY_BUDGET_MS if max_ms is None else max_ms
+        self.enforce = settings.QUERY_BUDGET_ENFORCE if enforce is None else enforce
+        self.slow_ms = settings.SLOW_QUERY_MS if slow_ms is None else slow_ms
+        self.records: List[QueryRecord] = []
+        self.db_ms = 0.0
+
+    def before(self):
+        # Checked before the statement runs, so an enforced budget stops the N+1th query itself
+        if self.enforce and self.max_queries and len(self.records) >= self.max_queries:
+            raise QueryBudgetExceeded(self.report(extra=1))
+
+    def add(self, statement: str, parameters, duration_ms: float, executemany: bool):
+        self.records.append(QueryRecord(statement, parameters, duration_ms, executemany))
+        self.db_ms += duration_ms
+        if self.enforce and self.max_ms and self.db_ms > self.max_ms:
+            raise QueryBudgetExceeded(self.report())
+
+    def exceeded(self, extra: int = 0) -> List[str]:
+        reasons = []
+        if self.max_queries and len(self.records) + extra > self.max_queries:
+            reasons.append(f"{len(self.records) + extra} queries > {self.max_queries}")
+        if self.max_ms and self.db_ms > self.max_ms:
+            reasons.append(f"{self.db_ms:.1f} ms in the database > {self.max_ms:g} ms")
+        return reasons
+
+    @property
+    def slow(self) -> List[QueryRecord]:
+        if not self.slow_ms:
+            return []
+        return [record for record in self.records if record.duration_ms >= self.slow_ms]
+
+    def report(self, extra: int = 0) -> dict:
+        return {
+            "label": self.label,
+            "queries": len(self.records) + extra,
+            "db_ms": round(self.db_ms, 3),
+            "budget": {"queries": self.max_queries or None, "db_ms": self.max_ms or None},
+            "exceeded": self.exceeded(extra),
+            "statements": [record.as_dict() for record in self.records],
+        }
+
+    async def explain_slow(self):
+        """EXPLAIN the slow statements on a separate connection, after the request's own work is done."""
+        slow = [record for record in self.slow if record.explainable]
+        if not slow:
+            return
+        from .database import async_engine
+        prefix = EXPLAIN_PREFIX.get(async_engine.dialect.name, "EXPLAIN ")
+        try:
+            async with async_engine.connect() as conn:
+                for record in slow:
+                    result = await conn.exec_driver_sql(prefix + record.statement, record.parameters)
+                    record.plan = [" ".join(str(value) for value in row) for row in result]
+                await conn.rollback()
+        except Exception as e:
+            logger.warning("Could not EXPLAIN slow queries for %s: %s", self.label, e)
+
+    def emit(self):
+        for record in self.records:
+            logger.debug("%s: %.1f ms %s", self.label, record.duration_ms, record.statement)
+        for record in self.slow:
+            logger.warning("Slow query in %s: %s", self.label, json.dumps(record.as_dict()))
+        if self.exceeded():
+            logger.warning("Query budget exceeded: %s", json.dumps(self.report()))
+
+
+_current: ContextVar[Optional[QueryLog]] = ContextVar("query_log", default=None)
+
+
+def current_log() -> Optional[QueryLog]:
+    return _current.get()
+
+
+def diagnostics_enabled() -> bool:
+    return bool(
+        settings.QUERY_LOG or settings.SLOW_QUERY_MS or settings.QUERY_BUDGET_COUNT or settings.QUERY_BUDGET_MS
+    )
+
+
+@asynccontextmanager
+async def record_queries(label: str = "", **budget):
+    """Record the statements issued inside the block; ``budget`` overrides the QUERY_BUDGET_* settings.
+
+    Usable directly in tests, e.g. ``async with record_queries(max_queries=2, enforce=True):``.
+    """
+    log = QueryLog(label, **budget)
+    token = _current.set(log)
+    try:
+        yield log
+    finally:
+        _current.reset(token)
+        await log.explain_slow()
+        log.emit()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    log = _current.get()
+    if log is not None:
+        log.before()
+        context._query_log_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    log = _current.get()
+    start = getattr(context, "_query_log_start", None)
+    if log is not None and start is not None:
+        log.add(statement, parameters, (time.perf_counter() - start) * 1000, executemany)
+
+
+def install(engine):
+    """Hook ``engine`` so statements land in the current QueryLog; a no-op unless diagnostics are on."""
+    if not diagnostics_enabled():
+        return
+    from sqlalchemy import event
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
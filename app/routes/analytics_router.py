@@ -0,0 +1,279 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import func, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, List, Optional
+from collections import defaultdict
+from decimal import Decimal
+import enum
+from ..analytics import ensure_fresh_summary
+from ..config import settings
+from ..database import get_db
+from ..models import models
+from ..schemas import schemas
+
+router = APIRouter(
+    prefix="/hr/analytics",
+    tags=["Analytics"]
+)
+
+
+class Dimension(str, enum.Enum):
+    department = "department"
+    position = "position"
+    status = "status"
+    employment_type = "employment_type"
+    work_type = "work_type"
+
+
+class SalaryField(str, enum.Enum):
+    ctc = "ctc"
+    monthly_salary = "monthly_salary"
+
+
+# Dimensions with a name to show: (label column, table joined for it, its primary key)
+LABELS = {
+    Dimension.department: (models.Department.title, models.Department, models.Department.department_id),
+    Dimension.position: (models.Position.title, models.Position, models.Position.position_id),
+}
+# employee_summary is grouped by (department, status); anything finer reads employees
+SUMMARY_DIMENSIONS = {Dimension.department, Dimension.status}
+PERCENTILES = (("p25", 0.25), ("p50", 0.5), ("p75", 0.75), ("p90", 0.9))
+
+
+def _key_column(source, dimension: Dimension):
+    return getattr(source, f"{dimension.value}_id" if dimension in LABELS else dimension.value)
+
+
+def _measures(source) -> dict:
+    if source is models.EmployeeSummary:
+        return {
+            "headcount": func.sum(source.headcount),
+            "ctc_total": func.sum(source.ctc_total),
+            "ctc_avg": func.sum(source.ctc_total) / func.nullif(func.sum(source.ctc_count), 0),
+            "monthly_salary_total": func.sum(source.monthly_salary_total),
+            "monthly_salary_avg": func.sum(source.monthly_salary_total) / func.nullif(func.sum(source.monthly_salary_count), 0),
+        }
+    return {
+        "headcount": func.count(),
+        "ctc_total": func.coalesce(func.sum(source.ctc), 0),
+        "ctc_avg": func.avg(source.ctc),
+        "monthly_salary_total": func.coalesce(func.sum(source.monthly_salary), 0),
+        "monthly_salary_avg": func.avg(source.monthly_salary),
+    }
+
+
+def _value(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+async def _grouped(
+    db: AsyncSession,
+    dimensions: List[Dimension],
+    measures: List[str],
+    department_ids: Optional[List[int]],
+    statuses: Optional[List[models.EmployeeStatus]],
+    live: bool,
+    summary_checked: bool = False
+) -> List[dict]:
+    """One GROUP BY over employees (or over employee_summary when it can answer).
+
+    ``summary_checked``: the caller already ran ensure_fresh_summary for this request.
+    """
+    use_summary = settings.ANALYTICS_SUMMARY and not live and set(dimensions) <= SUMMARY_DIMENSIONS
+    source = models.EmployeeSummary if use_summary else models.Employee
+    if use_summary and not summary_checked:
+        await ensure_fresh_summary(db)
+
+    columns, group_by, joins = [], [], []
+    for dimension in dimensions:
+        key = _key_column(source, dimension)
+        columns.append(key.label(f"{dimension.value}_key"))
+        group_by.append(key)
+        if dimension in LABELS:
+            label, table, pk = LABELS[dimension]
+            columns.append(label.label(f"{dimension.value}_label"))
+            group_by.append(label)
+            joins.append((table, key == pk))
+        else:
+            columns.append(literal(None).label(f"{dimension.value}_label"))
+
+    available = _measures(source)
+    query = select(*columns, *(available[name].label(name) for name in measures)).select_from(source)
+    for table, onclause in joins:
+        query = query.outerjoin(table, onclause)
+    if department_ids:
+        query = query.where(source.department_id.in_(department_ids))
+    if statuses:
+        query = query.where(source.status.in_(statuses))
+    query = query.group_by(*group_by).order_by(*group_by)
+
+    rows = []
+    for row in (await db.execute(query)).mappings():
+        row = {name: _value(value) for name, value in row.items()}
+        for dimension in dimensions:
+            if dimension not in LABELS:
+                row[f"{dimension.value}_label"] = row[f"{dimension.value}_key"]
+        rows.append(row)
+    return rows
+
+
+def _groups(rows: List[dict], dimension: Dimension, measures: List[str]) -> List[dict]:
+    groups = []
+    for row in rows:
+        group = {"key": row[f"{dimension.value}_key"], "label": row[f"{dimension.value}_label"]}
+        for name in measures:
+            # Averages stay None for groups without salaries; counts and totals do not
+            group[name] = row[name] if name.endswith("_avg") else row[name] or 0
+        groups.append(group)
+    return groups
+
+
+def department_ids_param():
+    return Query(None, description="Only these departments")
+
+def statuses_param():
+    return Query(None, description="Only employees with these statuses")
+
+def live_param():
+    return Query(False, description="Aggregate the employees table directly instead of the pre-computed summary")
+
+
+@router.get("/headcount", response_model=List[schemas.HeadcountGroup])
+async def headcount(
+    group_by: Dimension = Query(Dimension.department),
+    department_ids: Optional[List[int]] = department_ids_param(),
+    statuses: Optional[List[models.EmployeeStatus]] = statuses_param(),
+    live: bool = live_param(),
+    db: AsyncSession = Depends(get_db)
+):
+    rows = await _grouped(db, [group_by], ["headcount"], department_ids, statuses, live)
+    return _groups(rows, group_by, ["headcount"])
+
+
+PAYROLL_MEASURES = ["headcount", "ctc_total", "ctc_avg", "monthly_salary_total", "monthly_salary_avg"]
+
+@router.get("/payroll", response_model=List[schemas.PayrollGroup])
+async def payroll(
+    group_by: Dimension = Query(Dimension.department),
+    department_ids: Optional[List[int]] = department_ids_param(),
+    statuses: Optional[List[models.EmployeeStatus]] = statuses_param(),
+    live: bool = live_param(),
+    db: AsyncSession = Depends(get_db)
+):
+    rows = await _grouped(db, [group_by], PAYROLL_MEASURES, department_ids, statuses, live)
+    return _groups(rows, group_by, PAYROLL_MEASURES)
+
+
+@router.get("/status-breakdown", response_model=List[schemas.StatusBreakdown])
+async def status_breakdown(
+    department_ids: Optional[List[int]] = department_ids_param(),
+    live: bool = live_param(),
+    db: AsyncSession = Depends(get_db)
+):
+    rows = await _grouped(db, [Dimension.department, Dimension.status], ["headcount"], department_ids, None, live)
+    departments: Dict[Optional[int], dict] = {}
+    for row in rows:
+        department = departments.setdefault(row["department_key"], {
+            "department_id": row["department_key"],
+            "department": row["department_label"],
+            "total": 0,
+            "statuses": {status.value: 0 for status in models.EmployeeStatus},
+        })
+        department["total"] += row["headcount"]
+        if row["status_key"] is not None:
+            department["statuses"][row["status_key"]] += row["headcount"]
+    return list(departments.values())
+
+
+def _percentile_cont(values: List[float], fraction: float) -> float:
+    # Same linear interpolation as Postgres percentile_cont; values are sorted
+    position = fraction * (len(values) - 1)
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+@router.get("/salary-percentiles", response_model=List[schemas.SalaryPercentiles])
+async def salary_percentiles(
+    field: SalaryField = Query(SalaryField.ctc),
+    group_by: Dimension = Query(Dimension.department),
+    department_ids: Optional[List[int]] = department_ids_param(),
+    statuses: Optional[List[models.EmployeeStatus]] = statuses_param(),
+    db: AsyncSession = Depends(get_db)
+):
+    employee = models.Employee
+    value = getattr(employee, field.value)
+    key = _key_column(employee, group_by)
+    label, table, pk = LABELS.get(group_by, (None, None, None))
+    group_columns = [key] if label is None else [key, label]
+    postgres = db.get_bind().dialect.name == "postgresql"
+
+    if postgres:
+        query = select(
+            *group_columns,
+            func.count(value).label("count"),
+            func.min(value).label("min"),
+            func.max(value).label("max"),
+            *(func.percentile_cont(fraction).within_group(value).label(name) for name, fraction in PERCENTILES)
+        ).group_by(*group_columns).order_by(*group_columns)
+    else:
+        # No ordered-set aggregates here: stream the sorted values of one column and interpolate
+        query = select(*group_columns, value.label("value")).order_by(*group_columns, value)
+
+    query = query.select_from(employee).where(value.is_not(None))
+    if table is not None:
+        query = query.outerjoin(table, key == pk)
+    if department_ids:
+        query = query.where(employee.department_id.in_(department_ids))
+    if statuses:
+        query = query.where(employee.status.in_(statuses))
+
+    result = await db.execute(query)
+    if postgres:
+        return [
+            dict(
+                key=_value(row[0]),
+                label=row[1] if label is not None else _value(row[0]),
+                **{name: _value(row._mapping[name]) for name in ("count", "min", "max", *dict(PERCENTILES))}
+            )
+            for row in result
+        ]
+
+    groups: Dict = defaultdict(list)
+    labels = {}
+    for row in result:
+        groups[row[0]].append(float(row.value))
+        labels[row[0]] = row[1] if label is not None else _value(row[0])
+    return [
+        dict(
+            key=_value(group), label=labels[group], count=len(values), min=values[0], max=values[-1],
+            **{name: _percentile_cont(values, fraction) for name, fraction in PERCENTILES}
+        )
+        for group, values in groups.items()
+    ]
+
+
+@router.get("/summary", response_model=schemas.AnalyticsSummary)
+async def summary(db: AsyncSession = Depends(get_db)):
+    """Everything the dashboard's landing view needs, in two small queries over employee_summary."""
+    refreshed_at = await ensure_fresh_summary(db) if settings.ANALYTICS_SUMMARY else None
+    department_rows = await _grouped(db, [Dimension.department], PAYROLL_MEASURES, None, None, live=False, summary_checked=True)
+    status_rows = await _grouped(db, [Dimension.status], ["headcount"], None, None, live=False, summary_checked=True)
+    departments = _groups(department_rows, Dimension.department, PAYROLL_MEASURES)
+    statuses = {status.value: 0 for status in models.EmployeeStatus}
+    for row in status_rows:
+        if row["status_key"] is not None:
+            statuses[row["status_key"]] = row["headcount"]
+    return {
+        "refreshed_at": refreshed_at,
+        "headcount": sum(group["headcount"] for group in departments),
+        "active_headcount": statuses[models.EmployeeStatus.active.value],
+        "ctc_total": sum(group["ctc_total"] for group in departments),
+        "monthly_salary_total": sum(group["monthly_salary_total"] for group in departments),
+        "statuses": statuses,
+        "departments": departments,
+    }
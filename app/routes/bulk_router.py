@@ -0,0 +1,360 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, File, UploadFile
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, insert, update, case, literal, Enum
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import ValidationError
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+from datetime import date, datetime
+from decimal import Decimal
+import codecs
+import csv
+import enum
+import io
+import json
+import anyio
+from ..database import get_db, AsyncSessionLocal
+from ..analytics import schedule_summary_refresh
+from ..models import models
+from ..schemas import schemas
+
+router = APIRouter(
+    prefix="/hr",
+    tags=["HR"]
+)
+
+IMPORT_BATCH_SIZE = 1000
+# Employees per UPDATE statement; each contributes a few bind parameters per patched column
+UPDATE_CHUNK_SIZE = 500
+EXPORT_BATCH_SIZE = 1000
+FORMATS = ("csv", "ndjson")
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+EXPORT_COLUMNS = list(models.Employee.__table__.columns)
+# EmployeeCreate types these as plain str; check them here so a bad value is a row error, not a failed INSERT
+ENUM_FIELDS = {"employment_type": models.EmploymentType, "work_type": models.WorkType}
+EMPLOYEE_COLUMNS = models.Employee.__table__.c
+ENUM_COLUMNS = {column.key: column.type.enum_class for column in EMPLOYEE_COLUMNS if isinstance(column.type, Enum)}
+
+
+def _detect_format(file: UploadFile, format: Optional[str]) -> str:
+    if format:
+        if format not in FORMATS:
+            raise HTTPException(status_code=400, detail=f"Unsupported format: {format}. Use csv or ndjson")
+        return format
+    name = (file.filename or "").lower()
+    content_type = (file.content_type or "").lower()
+    if name.endswith((".ndjson", ".jsonl")) or "ndjson" in content_type or "jsonl" in content_type:
+        return "ndjson"
+    return "csv"
+
+
+def _read_records(fileobj, format: str) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    # Decodes incrementally from the spooled upload; yields (row number, record, parse error)
+    text = codecs.getreader("utf-8-sig")(fileobj)
+    if format == "csv":
+        reader = csv.DictReader(text)
+        for row_number, row in enumerate(reader, start=1):
+            # Empty CSV cells mean "not provided" for optional fields
+            yield row_number, {key: value for key, value in row.items() if key and value != ""}, None
+        return
+    for row_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield row_number, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield row_number, None, "Expected a JSON object"
+            continue
+        yield row_number, record, None
+
+
+def _validated_batches(fileobj, format: str) -> Iterator[List[Tuple[int, Optional[schemas.EmployeeCreate], List[str]]]]:
+    batch = []
+    for row_number, record, error in _read_records(fileobj, format):
+        if error:
+            batch.append((row_number, None, [error]))
+        else:
+            try:
+                batch.append((row_number, schemas.EmployeeCreate(**record), []))
+            except ValidationError as e:
+                messages = [f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in e.errors()]
+                batch.append((row_number, None, messages))
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def _existing_ids(db: AsyncSession, pk_column, ids: Set[int], known: Set[int]) -> Set[int]:
+    missing = ids - known
+    if missing:
+        known.update(await db.scalars(select(pk_column).where(pk_column.in_(missing))))
+    return known
+
+
+@router.post("/employees/import/", response_model=schemas.EmployeeImportResult)
+async def import_employees(
+    file: UploadFile = File(..., description="CSV with a header row, or NDJSON with one employee object per line"),
+    format: Optional[str] = Query(None, description="csv or ndjson; detected from the file name when omitted"),
+    dry_run: bool = Query(False, description="Validate everything but insert nothing; would_insert counts the rows that passed"),
+    db: AsyncSession = Depends(get_db)
+):
+    format = _detect_format(file, format)
+    batches = _validated_batches(file.file, format)
+    result = schemas.EmployeeImportResult(total=0, inserted=0, failed=0, errors=[])
+    known_departments: Set[int] = set()
+    known_positions: Set[int] = set()
+    seen_emails: Set[str] = set()
+
+    try:
+        while True:
+            # Parsing and validation are CPU/file bound; run them off the event loop a batch at a time
+            batch = await anyio.to_thread.run_sync(next, batches, None)
+            if batch is None:
+                break
+
+            valid = [(row_number, employee) for row_number, employee, _ in batch if employee is not None]
+            await _existing_ids(db, models.Department.department_id, {e.department_id for _, e in valid}, known_departments)
+            await _existing_ids(db, models.Position.position_id, {e.position_id for _, e in valid}, known_positions)
+            emails = {e.email for _, e in valid}
+            taken = set(await db.scalars(select(models.Employee.email).where(models.Employee.email.in_(emails)))) if emails else set()
+
+            rows: List[Dict] = []
+            for row_number, employee, errors in batch:
+                result.total += 1
+                if employee is not None:
+                    for field, enum_class in ENUM_FIELDS.items():
+                        value = getattr(employee, field)
+                        if value not in enum_class.__members__ and value not in {m.value for m in enum_class}:
+                            errors.append(f"{field}: must be one of {', '.join(m.value for m in enum_class)}")
+                    if employee.department_id not in known_departments:
+                        errors.append("department_id: Department not found")
+                    if employee.position_id not in known_positions:
+                        errors.append("position_id: Position not found")
+                    if employee.email in taken or employee.email in seen_emails:
+                        errors.append("email: Email already exists")
+                if errors:
+                    result.failed += 1
+                    result.errors.append(schemas.ImportRowError(
+                        row=row_number,
+                        email=employee.email if employee else None,
+                        errors=errors
+                    ))
+                    continue
+                seen_emails.add(employee.email)
+                rows.append(employee.dict())
+
+            if rows and not dry_run:
+                # One multi-row INSERT per batch (insertmanyvalues), all inside a single transaction
+                await db.execute(insert(models.Employee), rows)
+            result.inserted += len(rows)
+
+        if dry_run:
+            await db.rollback()
+            result.would_insert = result.inserted
+            result.inserted = 0
+        else:
+            await db.commit()
+            schedule_summary_refresh()
+    except IntegrityError as e:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail=f"Import aborted, nothing was inserted: {e.orig}")
+    return result
+
+
+def _export_value(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+async def _export_rows(format: str):
+    # Own session: the response streams after the request's dependencies have finished
+    async with AsyncSessionLocal() as session:
+        result = await session.stream(
+            select(*EXPORT_COLUMNS)
+            .order_by(models.Employee.employee_id)
+            .execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        names = [column.key for column in EXPORT_COLUMNS]
+        if format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(names)
+            async for partition in result.partitions():
+                writer.writerows([_export_value(value) for value in row] for row in partition)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            if buffer.tell():
+                yield buffer.getvalue()
+        else:
+            async for partition in result.partitions():
+                yield "".join(
+                    json.dumps(dict(zip(names, (_export_value(value) for value in row)))) + "\n"
+                    for row in partition
+                )
+
+
+@router.get("/employees/export/")
+async def export_employees(format: str = Query("csv", description="csv or ndjson")):
+    if format not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {format}. Use csv or ndjson")
+    return StreamingResponse(
+        _export_rows(format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="employees.{format}"'}
+    )
+
+
+def _patch_errors(values: dict, known_departments: Set[int], known_positions: Set[int]) -> List[str]:
+    errors = []
+    for field, value in values.items():
+        column = EMPLOYEE_COLUMNS[field]
+        if value is None:
+            if not column.nullable:
+                errors.append(f"{field}: may not be null")
+            continue
+        enum_class = ENUM_COLUMNS.get(field)
+        if enum_class and value not in enum_class.__members__ and value not in {m.value for m in enum_class}:
+            errors.append(f"{field}: must be one of {', '.join(m.value for m in enum_class)}")
+    if values.get("department_id") is not None and values["department_id"] not in known_departments:
+        errors.append("department_id: Department not found")
+    if values.get("position_id") is not None and values["position_id"] not in known_positions:
+        errors.append("position_id: Position not found")
+    return errors
+
+
+def _per_employee_update(patches: Dict[int, dict]):
+    """One UPDATE for many employees: each patched column becomes CASE employee_id WHEN ... END.
+
+    Employees that do not set a column keep their value through the ELSE branch.
+    """
+    values = {}
+    for field in sorted({field for patch in patches.values() for field in patch}):
+        column = EMPLOYEE_COLUMNS[field]
+        # Typed literals, so Postgres compares enum columns with enum values rather than varchar
+        whens = {employee_id: literal(patch[field], column.type) for employee_id, patch in patches.items() if field in patch}
+        values[field] = case(whens, value=EMPLOYEE_COLUMNS.employee_id, else_=column)
+    return (
+        update(models.Employee.__table__)
+        .where(EMPLOYEE_COLUMNS.employee_id.in_(list(patches)))
+        .values(values)
+        .returning(*EMPLOYEE_COLUMNS)
+    )
+
+
+def _filter_conditions(filter: schemas.EmployeeFilter) -> list:
+    conditions = []
+    for field, column in (
+        ("employee_ids", EMPLOYEE_COLUMNS.employee_id),
+        ("department_ids", EMPLOYEE_COLUMNS.department_id),
+        ("position_ids", EMPLOYEE_COLUMNS.position_id),
+        ("statuses", EMPLOYEE_COLUMNS.status),
+        ("employment_types", EMPLOYEE_COLUMNS.employment_type),
+        ("work_types", EMPLOYEE_COLUMNS.work_type),
+    ):
+        values = getattr(filter, field)
+        if not values:
+            continue
+        enum_class = ENUM_COLUMNS.get(column.key)
+        if enum_class:
+            unknown = [value for value in values if value not in enum_class.__members__ and value not in {m.value for m in enum_class}]
+            if unknown:
+                raise HTTPException(status_code=400, detail=f"{field}: unknown values {', '.join(unknown)}")
+        conditions.append(column.in_(values))
+    return conditions
+
+
+@router.patch("/employees/batch/", response_model=schemas.EmployeeBatchUpdateResult)
+async def batch_update_employees(batch: schemas.EmployeeBatchUpdate, db: AsyncSession = Depends(get_db)):
+    """Apply many employee changes in one transaction.
+
+    Send ``updates`` (per-employee patches, fields as in PATCH /hr/employees/{id})
+    or ``filter`` plus ``patch``. Changes go out as a few set-based UPDATEs whose
+    RETURNING rows are the updated employees; invalid patches are reported and
+    skipped, and a constraint violation (e.g. a duplicate email) rolls back everything.
+    """
+    if (batch.updates is None) == (batch.patch is None):
+        raise HTTPException(status_code=400, detail="Send either updates, or filter and patch")
+
+    if batch.updates is not None:
+        patches = {}
+        for item in batch.updates:
+            if item.employee_id in patches:
+                raise HTTPException(status_code=400, detail=f"Employee {item.employee_id} is listed more than once")
+            patches[item.employee_id] = item.dict(exclude_unset=True, exclude={"employee_id"})
+    else:
+        conditions = _filter_conditions(batch.filter) if batch.filter else []
+        if not conditions:
+            raise HTTPException(status_code=400, detail="A filter with at least one condition is required")
+        patches = None
+
+    patch_values = [batch.patch.dict(exclude_unset=True)] if patches is None else list(patches.values())
+    known_departments = await _existing_ids(db, models.Department.department_id, {v["department_id"] for v in patch_values if v.get("department_id") is not None}, set())
+    known_positions = await _existing_ids(db, models.Position.position_id, {v["position_id"] for v in patch_values if v.get("position_id") is not None}, set())
+
+    results: Dict[int, schemas.BatchUpdateItem] = {}
+    try:
+        if patches is None:
+            values = patch_values[0]
+            errors = _patch_errors(values, known_departments, known_positions)
+            if errors:
+                raise HTTPException(status_code=400, detail=errors)
+            if not values:
+                raise HTTPException(status_code=400, detail="The patch does not change anything")
+            rows = await db.execute(
+                update(models.Employee.__table__).where(*conditions).values(values).returning(*EMPLOYEE_COLUMNS)
+            )
+            for row in rows.mappings():
+                results[row["employee_id"]] = schemas.BatchUpdateItem(
+                    employee_id=row["employee_id"], outcome="updated", employee=schemas.Employee.model_validate(dict(row))
+                )
+        else:
+            valid = {}
+            for employee_id, values in patches.items():
+                errors = _patch_errors(values, known_departments, known_positions)
+                if errors:
+                    results[employee_id] = schemas.BatchUpdateItem(employee_id=employee_id, outcome="invalid", errors=errors)
+                elif values:
+                    valid[employee_id] = values
+            # An empty patch changes nothing; it only reports whether the employee exists
+            unchanged = [employee_id for employee_id, values in patches.items() if not values]
+            if unchanged:
+                existing = set(await db.scalars(select(EMPLOYEE_COLUMNS.employee_id).where(EMPLOYEE_COLUMNS.employee_id.in_(unchanged))))
+                for employee_id in existing:
+                    results[employee_id] = schemas.BatchUpdateItem(employee_id=employee_id, outcome="updated")
+
+            ids = list(valid)
+            for start in range(0, len(ids), UPDATE_CHUNK_SIZE):
+                chunk = {employee_id: valid[employee_id] for employee_id in ids[start:start + UPDATE_CHUNK_SIZE]}
+                for row in (await db.execute(_per_employee_update(chunk))).mappings():
+                    results[row["employee_id"]] = schemas.BatchUpdateItem(
+                        employee_id=row["employee_id"], outcome="updated", employee=schemas.Employee.model_validate(dict(row))
+                    )
+            for employee_id in patches:
+                results.setdefault(employee_id, schemas.BatchUpdateItem(employee_id=employee_id, outcome="not_found"))
+            results = {employee_id: results[employee_id] for employee_id in patches}
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail=f"Batch update aborted, nothing was changed: {e.orig}")
+
+    if any(item.outcome == "updated" for item in results.values()):
+        schedule_summary_refresh()
+    outcomes = [item.outcome for item in results.values()]
+    return schemas.EmployeeBatchUpdateResult(
+        updated=outcomes.count("updated"),
+        not_found=outcomes.count("not_found"),
+        invalid=outcomes.count("invalid"),
+        results=list(results.values())
+    )
@@ -1,278 +1,532 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, File, UploadFile, Form
-from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from fastapi import APIRouter, Depends, HTTPException, status, Query, File, UploadFile, Form, Header, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import TypeAdapter
 from typing import List, Optional
-import shutil
 import os
+import anyio
 from pathlib import Path
 from ..database import get_db
 from ..models import models
 from ..schemas import schemas
-from datetime import datetime
-
-# Create uploads directory if it doesn't exist
-UPLOAD_DIR = Path("uploads")
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+from ..pagination import NEXT_CURSOR_HEADER, Keyset, paginate, page_rows, split_page
+from ..loading import EMPLOYEE_INCLUDES, include_param, parse_include, employee_options, document_options
+from ..search import SearchMode, search_mode_param, match_filter, rank_expression
+from ..storage import UploadLimitRoute, StoredBlob, blob_lock, store_stream, iter_upload, serve_document, etag_matches
+from ..cache import response_cache, collection_etag, LISTING_CACHE_CONTROL
+from ..analytics import schedule_summary_refresh
+from ..config import settings
+from ..jobs import start_job, get_job
+from ..purge import purge_employee, purge_department, purge_department_job, department_purged, release_files
+from ..writes import insert_returning, update_returning
+from ..expiry import ensure_fresh_scan, request_expiry_scan
+from ..fastjson import (
+    DEPARTMENT, POSITION, FastJSONResponse, employee_columns, employee_items, fast_json_param, use_fast_json,
+    fields_param, parse_fields
+)
+from ..streaming import StreamFormat, stream_param, stream_rows, encode_with
+from datetime import datetime, timedelta
 
 router = APIRouter(
     prefix="/hr",
     tags=["HR"]
 )
+# Upload endpoints check Content-Length before the body is parsed. Mounted by the app next to router, with the
+# same prefix of its own: a nested include would leave scope["route"].path (metrics, query log) without "/hr"
+upload_router = APIRouter(prefix="/hr", tags=["HR"], route_class=UploadLimitRoute)
+
+async def _get_employee(db: AsyncSession, employee_id: int, include: Optional[str] = None):
+    # Explicit loader options: lazy loading is not available on an AsyncSession
+    return await db.scalar(
+        select(models.Employee).options(*employee_options(include)).where(models.Employee.employee_id == employee_id)
+    )
+
+# Cached reads are serialized once and stored as JSON bytes
+_department_json = TypeAdapter(schemas.Department)
+_departments_json = TypeAdapter(List[schemas.Department])
+_positions_json = TypeAdapter(List[schemas.Position])
+
+async def _fast_employees(
+    db: AsyncSession,
+    query,
+    include: Optional[str],
+    fields: Optional[List[str]] = None,
+    keyset: Optional[Keyset] = None,
+    limit: int = 0
+):
+    # Same JSON as response_model=List[schemas.Employee] (narrowed to ``fields``), built from column rows
+    required = [models.Employee.__table__.c.employee_id]
+    if keyset is not None:
+        required.append(keyset.sort_column)
+    rows = (await db.execute(employee_columns(query, fields, required))).all()
+    headers = {}
+    if keyset is not None:
+        rows, next_cursor = split_page(rows, keyset, limit)
+        if next_cursor:
+            headers[NEXT_CURSOR_HEADER] = next_cursor
+    return FastJSONResponse(await employee_items(db, rows, include, fields), headers=headers)
+
+def if_none_match_param():
+    return Header(None, description="ETag of a previously fetched page; answered with 304 when the listing is unchanged")
+
+async def _cached_listing(if_none_match: Optional[str], db: AsyncSession, model, namespace: str, key: str, load_page):
+    # Conditional GET: one aggregate query decides the 304 before the cache or the rows are touched
+    if if_none_match:
+        etag = await collection_etag(db, model, key)
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": f"W/{etag}", "Cache-Control": LISTING_CACHE_CONTROL})
+
+    async def load():
+        # Tag computed before the rows: a write in between leaves it stale, which only costs a 200 later
+        etag = await collection_etag(db, model, key)
+        body, headers = await load_page()
+        return body, {**headers, "ETag": f"W/{etag}", "Cache-Control": LISTING_CACHE_CONTROL}
+
+    return await response_cache.get_or_load(namespace, key, load)
+
+def _cached_page(adapter: TypeAdapter, rows, keyset: Keyset, limit: int):
+    rows, next_cursor = split_page(rows, keyset, limit)
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+    return adapter.dump_json(adapter.validate_python(rows, from_attributes=True)), headers
 
 # Department routes
 @router.post("/departments/", response_model=schemas.Department, status_code=status.HTTP_201_CREATED)
-def create_department(department: schemas.DepartmentCreate, db: Session = Depends(get_db)):
+async def create_department(department: schemas.DepartmentCreate, db: AsyncSession = Depends(get_db)):
     try:
-        db_dept = models.Department(
-            title=department.title,
-            description=department.description,
-            created_at=datetime.utcnow(),
-            updated_at=datetime.utcnow()
-        )
-        db.add(db_dept)
-        db.commit()
-        db.refresh(db_dept)
+        db_dept = await insert_returning(db, models.Department, {
+            "title": department.title,
+            "description": department.description,
+            "created_at": datetime.utcnow(),
+            "updated_at": datetime.utcnow()
+        })
+        await response_cache.invalidate("departments")
         return db_dept
+    except HTTPException:
+        raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/departments/", response_model=List[schemas.Department])
-def list_departments(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    departments = db.query(models.Department).offset(skip).limit(limit).all()
-    return departments
+async def list_departments(
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    if_none_match: Optional[str] = if_none_match_param(),
+    db: AsyncSession = Depends(get_db)
+):
+    keyset = Keyset(models.Department.__table__.c.department_id, models.Department.__table__.c.department_id)
+
+    async def load():
+        rows = (await db.scalars(paginate(select(models.Department), keyset, cursor, skip, limit))).all()
+        return _cached_page(_departments_json, rows, keyset, limit)
+
+    return await _cached_listing(if_none_match, db, models.Department, "departments", f"list:{skip}:{limit}:{cursor or ''}", load)
 
 @router.get("/departments/{department_id}", response_model=schemas.Department)
-def get_department(department_id: int, db: Session = Depends(get_db)):
-    department = db.query(models.Department).filter(models.Department.department_id == department_id).first()
-    if not department:
-        raise HTTPException(status_code=404, detail="Department not found")
-    return department
+async def get_department(department_id: int, db: AsyncSession = Depends(get_db)):
+    async def load():
+        department = await db.scalar(select(models.Department).where(models.Department.department_id == department_id))
+        if not department:
+            raise HTTPException(status_code=404, detail="Department not found")
+        return _department_json.dump_json(_department_json.validate_python(department, from_attributes=True)), {}
+
+    return await response_cache.get_or_load("departments", f"id:{department_id}", load)
 
 @router.patch("/departments/{department_id}", response_model=schemas.Department)
-def update_department(department_id: int, department: schemas.DepartmentUpdate, db: Session = Depends(get_db)):
-    db_dept = db.query(models.Department).filter(models.Department.department_id == department_id).first()
+async def update_department(department_id: int, department: schemas.DepartmentUpdate, db: AsyncSession = Depends(get_db)):
+    # One UPDATE ... RETURNING: no lookup before, no refresh after
+    db_dept = await update_returning(
+        db, models.Department, models.Department.department_id, department_id, department.dict(exclude_unset=True)
+    )
     if not db_dept:
         raise HTTPException(status_code=404, detail="Department not found")
-    
-    for key, value in department.dict(exclude_unset=True).items():
-        setattr(db_dept, key, value)
-    
-    db.commit()
-    db.refresh(db_dept)
+    await response_cache.invalidate("departments")
     return db_dept
 
-@router.delete("/departments/{department_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_department(department_id: int, db: Session = Depends(get_db)):
-    db_dept = db.query(models.Department).filter(models.Department.department_id == department_id).first()
-    if not db_dept:
+@router.delete(
+    "/departments/{department_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    responses={202: {"model": schemas.Job, "description": "Deletion continues in the background"}}
+)
+async def delete_department(
+    department_id: int,
+    background: Optional[bool] = Query(
+        None,
+        description="Run as a background job and answer 202 with the job; by default only departments "
+                    "above the configured headcount are deleted in the background"
+    ),
+    db: AsyncSession = Depends(get_db)
+):
+    exists = await db.scalar(select(models.Department.department_id).where(models.Department.department_id == department_id))
+    if not exists:
         raise HTTPException(status_code=404, detail="Department not found")
     
-    db.delete(db_dept)
-    db.commit()
+    if background is None:
+        headcount = await db.scalar(
+            select(func.count()).select_from(models.Employee).where(models.Employee.department_id == department_id)
+        )
+        background = headcount > settings.DEPARTMENT_DELETE_SYNC_LIMIT
+    if background:
+        job = await start_job(db, "delete_department", {"department_id": department_id}, lambda: purge_department_job(department_id))
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content=jsonable_encoder(schemas.Job.model_validate(job)),
+            headers={"Location": f"/hr/jobs/{job.id}"}
+        )
+    
+    # Bulk DELETEs instead of loading every employee, position and document through the ORM cascade
+    _, files = await purge_department(db, department_id)
+    await department_purged(files)
     return {"ok": True}
 
+@router.get("/jobs/{job_id}", response_model=schemas.Job)
+async def get_background_job(job_id: str, db: AsyncSession = Depends(get_db)):
+    job = await get_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
 # Position routes
 @router.post("/positions/", response_model=schemas.Position)
-def create_position(position: schemas.PositionCreate, db: Session = Depends(get_db)):
-    # Verify department exists
-    department = db.query(models.Department).filter(models.Department.department_id == position.department_id).first()
-    if not department:
-        raise HTTPException(status_code=404, detail="Department not found")
-    
-    db_position = models.Position(**position.dict())
-    db.add(db_position)
-    db.commit()
-    db.refresh(db_position)
+async def create_position(position: schemas.PositionCreate, db: AsyncSession = Depends(get_db)):
+    # A missing department surfaces as the foreign key violation of the INSERT itself
+    db_position = await insert_returning(
+        db, models.Position, position.dict(), references={"department_id": "Department not found"}
+    )
+    await response_cache.invalidate("positions")
     return db_position
 
 @router.get("/positions/", response_model=List[schemas.Position])
-def list_positions(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    positions = db.query(models.Position).offset(skip).limit(limit).all()
-    return positions
+async def list_positions(
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    if_none_match: Optional[str] = if_none_match_param(),
+    db: AsyncSession = Depends(get_db)
+):
+    keyset = Keyset(models.Position.__table__.c.position_id, models.Position.__table__.c.position_id)
+
+    async def load():
+        rows = (await db.scalars(paginate(select(models.Position), keyset, cursor, skip, limit))).all()
+        return _cached_page(_positions_json, rows, keyset, limit)
+
+    return await _cached_listing(if_none_match, db, models.Position, "positions", f"list:{skip}:{limit}:{cursor or ''}", load)
 
 @router.patch("/positions/{position_id}", response_model=schemas.Position)  # Changed from designation_id
-def update_position(
+async def update_position(
     position_id: int,  # Changed parameter name
     position: schemas.PositionUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    db_position = db.query(models.Position).filter(models.Position.position_id == position_id).first()  # Updated field name
+    db_position = await update_returning(
+        db, models.Position, models.Position.position_id, position_id, position.dict(exclude_unset=True),  # Updated field name
+        references={"department_id": "Department not found"}
+    )
     if not db_position:
         raise HTTPException(status_code=404, detail="Position not found")
-    
-    if position.department_id:
-        department = db.query(models.Department).filter(models.Department.department_id == position.department_id).first()
-        if not department:
-            raise HTTPException(status_code=404, detail="Department not found")
-    
-    for key, value in position.dict(exclude_unset=True).items():
-        setattr(db_position, key, value)
-    
-    db.commit()
-    db.refresh(db_position)
+    await response_cache.invalidate("positions")
     return db_position
 
 # Employee routes
+EMPLOYEE_REFERENCES = {"department_id": "Department not found", "position_id": "Position not found"}
+
 @router.post("/employees/", response_model=schemas.Employee, status_code=status.HTTP_201_CREATED)
-def create_employee(employee: schemas.EmployeeCreate, db: Session = Depends(get_db)):
-    db_employee = models.Employee(**employee.dict())
-    db.add(db_employee)
-    db.commit()
-    db.refresh(db_employee)
+async def create_employee(employee: schemas.EmployeeCreate, db: AsyncSession = Depends(get_db)):
+    db_employee = await insert_returning(
+        db, models.Employee, employee.dict(), options=employee_options(None),
+        references=EMPLOYEE_REFERENCES, conflicts={"email": "Email already exists"}
+    )
+    schedule_summary_refresh()
     return db_employee
 
 @router.get("/employees/", response_model=List[schemas.Employee])
-def list_employees(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    employees = db.query(models.Employee).offset(skip).limit(limit).all()
-    return employees
+async def list_employees(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    include: Optional[str] = include_param("documents"),
+    fields: Optional[str] = fields_param(),
+    fast: Optional[bool] = fast_json_param(),
+    db: AsyncSession = Depends(get_db)
+):
+    keyset = Keyset(models.Employee.__table__.c.employee_id, models.Employee.__table__.c.employee_id)
+    query = paginate(select(models.Employee), keyset, cursor, skip, limit)
+    fields = parse_fields(fields)
+    # A field subset always takes the column path: response_model would fill the missing fields back in
+    if fields or use_fast_json("list_employees", fast):
+        return await _fast_employees(db, query, include, fields, keyset, limit)
+    employees = (await db.scalars(query.options(*employee_options(include)))).all()
+    return page_rows(employees, keyset, limit, response)
 
 @router.get("/employees/{employee_id}", response_model=schemas.Employee)
-def get_employee(employee_id: int, db: Session = Depends(get_db)):
-    employee = db.query(models.Employee).filter(models.Employee.employee_id == employee_id).first()
+async def get_employee(
+    employee_id: int,
+    include: Optional[str] = include_param("documents"),
+    fields: Optional[str] = fields_param(),
+    db: AsyncSession = Depends(get_db)
+):
+    fields = parse_fields(fields)
+    if fields:
+        query = select(models.Employee).where(models.Employee.employee_id == employee_id)
+        rows = (await db.execute(employee_columns(query, fields, [models.Employee.__table__.c.employee_id]))).all()
+        if not rows:
+            raise HTTPException(status_code=404, detail="Employee not found")
+        return FastJSONResponse((await employee_items(db, rows, include, fields))[0])
+    employee = await _get_employee(db, employee_id, include)
     if not employee:
         raise HTTPException(status_code=404, detail="Employee not found")
     return employee
 
 @router.patch("/employees/{employee_id}", response_model=schemas.Employee)
-def update_employee(employee_id: int, employee: schemas.EmployeeUpdate, db: Session = Depends(get_db)):
-    db_employee = db.query(models.Employee).filter(models.Employee.employee_id == employee_id).first()
+async def update_employee(employee_id: int, employee: schemas.EmployeeUpdate, db: AsyncSession = Depends(get_db)):
+    db_employee = await update_returning(
+        db, models.Employee, models.Employee.employee_id, employee_id, employee.dict(exclude_unset=True),
+        options=employee_options(None), references=EMPLOYEE_REFERENCES, conflicts={"email": "Email already exists"}
+    )
     if not db_employee:
         raise HTTPException(status_code=404, detail="Employee not found")
-    
-    for key, value in employee.dict(exclude_unset=True).items():
-        setattr(db_employee, key, value)
-    
-    db.commit()
-    db.refresh(db_employee)
+    schedule_summary_refresh()
     return db_employee
 
 @router.delete("/employees/{employee_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_employee(employee_id: int, db: Session = Depends(get_db)):
-    db_employee = db.query(models.Employee).filter(models.Employee.employee_id == employee_id).first()
-    if not db_employee:
+async def delete_employee(employee_id: int, db: AsyncSession = Depends(get_db)):
+    # Also removes rows in documents, which the ORM cascade never covered (a foreign key error on delete)
+    found, files = await purge_employee(db, employee_id)
+    if not found:
         raise HTTPException(status_code=404, detail="Employee not found")
-    
-    db.delete(db_employee)
-    db.commit()
+    schedule_summary_refresh()
+    release_files(files)
     return {"ok": True}
 
 # Document routes
 @router.post("/documents/", response_model=schemas.Document)
-def create_document(document: schemas.DocumentCreate, db: Session = Depends(get_db)):
-    db_document = models.Document(**document.dict())
-    db.add(db_document)
-    db.commit()
-    db.refresh(db_document)
+async def create_document(document: schemas.DocumentCreate, db: AsyncSession = Depends(get_db)):
+    db_document = await insert_returning(
+        db, models.Document, document.dict(), options=document_options(None),
+        references={"employee_id": "Employee not found"}
+    )
+    if db_document.expiry_date is not None:
+        request_expiry_scan()
     return db_document
 
+@router.get("/documents/expiring", response_model=List[schemas.ExpiringDocument])
+async def list_expiring_documents(
+    response: Response,
+    within_days: int = Query(30, ge=0, description="Documents expiring within this many days"),
+    include_expired: bool = Query(True, description="Also list documents that have already expired"),
+    type: Optional[str] = Query(None, description="Only this document type, e.g. passport"),
+    employee_id: Optional[int] = Query(None),
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    db: AsyncSession = Depends(get_db)
+):
+    # Served from expiring_documents, which the background scanner keeps current
+    if within_days > settings.DOCUMENT_EXPIRY_WINDOW_DAYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"within_days can be at most {settings.DOCUMENT_EXPIRY_WINDOW_DAYS} (DOCUMENT_EXPIRY_WINDOW_DAYS)"
+        )
+    await ensure_fresh_scan(db)
+    today = datetime.utcnow().date()
+    expiring = models.ExpiringDocument
+    query = select(expiring).where(expiring.expiry_date <= today + timedelta(days=within_days))
+    if not include_expired:
+        query = query.where(expiring.expiry_date >= today)
+    if type:
+        query = query.where(expiring.type == type)
+    if employee_id:
+        query = query.where(expiring.employee_id == employee_id)
+    keyset = Keyset(expiring.__table__.c.expiry_date, expiring.__table__.c.document_id)
+    rows = (await db.scalars(paginate(query, keyset, cursor, skip, limit))).all()
+    columns = expiring.__table__.c.keys()
+    return [
+        {**{column: getattr(row, column) for column in columns}, "days_left": (row.expiry_date - today).days}
+        for row in page_rows(rows, keyset, limit, response)
+    ]
+
 @router.get("/documents/", response_model=List[schemas.Document])
-def list_documents(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    documents = db.query(models.Document).offset(skip).limit(limit).all()
-    return documents
+async def list_documents(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    include: Optional[str] = include_param("employee or employee.documents"),
+    db: AsyncSession = Depends(get_db)
+):
+    keyset = Keyset(models.Document.__table__.c.id, models.Document.__table__.c.id)
+    query = select(models.Document).options(*document_options(include))
+    documents = (await db.scalars(paginate(query, keyset, cursor, skip, limit))).all()
+    return page_rows(documents, keyset, limit, response)
+
+async def _ensure_employee(db: AsyncSession, employee_id: int):
+    employee = await db.scalar(select(models.Employee.employee_id).where(models.Employee.employee_id == employee_id))
+    if not employee:
+        raise HTTPException(status_code=404, detail="Employee not found")
 
-@router.post("/employees/{employee_id}/documents/", response_model=schemas.EmployeeDocument)
+async def _save_document(
+    db: AsyncSession,
+    employee_id: int,
+    document_type: str,
+    blob: StoredBlob,
+    filename: Optional[str],
+    content_type: Optional[str]
+):
+    # Locked until the row is committed, so orphan cleanup cannot remove a blob this upload deduplicated onto
+    try:
+        async with blob_lock(db, blob.sha256):
+            # Re-uploading the same file as the same document returns the existing record
+            existing = await db.scalar(select(models.EmployeeDocument).where(
+                models.EmployeeDocument.employee_id == employee_id,
+                models.EmployeeDocument.document_type == document_type,
+                models.EmployeeDocument.content_hash == blob.sha256
+            ))
+            if existing:
+                await db.commit()  # releases the lock on Postgres
+                return existing
+            
+            await anyio.to_thread.run_sync(blob.ensure_stored)
+            return await insert_returning(db, models.EmployeeDocument, {
+                "employee_id": employee_id,
+                "document_type": document_type,
+                "document_path": str(blob.path),
+                "content_hash": blob.sha256,
+                "size_bytes": blob.size,
+                "original_filename": os.path.basename(filename) if filename else None,
+                "content_type": content_type
+            }, references={"employee_id": "Employee not found"})
+    finally:
+        await anyio.to_thread.run_sync(blob.discard_spare)
+
+@upload_router.post("/employees/{employee_id}/documents/", response_model=schemas.EmployeeDocument)
 async def upload_employee_document(
     employee_id: int,
     document_type: str = Form(...),
     file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    # Verify employee exists
-    employee = db.query(models.Employee).filter(models.Employee.employee_id == employee_id).first()
-    if not employee:
-        raise HTTPException(status_code=404, detail="Employee not found")
-    
-    # Create safe filename
-    file_path = UPLOAD_DIR / f"{employee_id}_{document_type}_{file.filename}"
+    await _ensure_employee(db, employee_id)
     
-    # Save file
+    # Stream into the content-addressed store in chunks, hashing on the way
     try:
-        with file_path.open("wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        blob = await store_stream(iter_upload(file))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Could not upload file: {str(e)}")
     
-    # Create document record
-    db_document = models.EmployeeDocument(
-        employee_id=employee_id,
-        document_type=document_type,
-        document_path=str(file_path)
-    )
+    return await _save_document(db, employee_id, document_type, blob, file.filename, file.content_type)
+
+@upload_router.post(
+    "/employees/{employee_id}/documents/stream",
+    response_model=schemas.EmployeeDocument,
+    openapi_extra={"requestBody": {"content": {"application/octet-stream": {"schema": {"type": "string", "format": "binary"}}}}}
+)
+async def stream_employee_document(
+    employee_id: int,
+    request: Request,
+    document_type: str = Query(...),
+    filename: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_db)
+):
+    """Upload the raw file as the request body; nothing is buffered or spooled before it is stored."""
+    await _ensure_employee(db, employee_id)
     
-    db.add(db_document)
-    db.commit()
-    db.refresh(db_document)
+    try:
+        blob = await store_stream(request.stream())
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Could not upload file: {str(e)}")
     
-    return db_document
+    return await _save_document(db, employee_id, document_type, blob, filename, request.headers.get("content-type"))
 
 @router.get("/employees/{employee_id}/documents/", response_model=List[schemas.EmployeeDocument])
-def get_employee_documents(
+async def get_employee_documents(
     employee_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    employee = db.query(models.Employee).filter(models.Employee.employee_id == employee_id).first()
+    employee = await db.scalar(select(models.Employee.employee_id).where(models.Employee.employee_id == employee_id))
     if not employee:
         raise HTTPException(status_code=404, detail="Employee not found")
     
-    return employee.documents
+    documents = await db.scalars(
+        select(models.EmployeeDocument).where(models.EmployeeDocument.employee_id == employee_id)
+    )
+    return documents.all()
 
 @router.get("/employees/{employee_id}/documents/{document_id}")
 async def get_document(
     employee_id: int,
     document_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_db)
 ):
-    document = db.query(models.EmployeeDocument).filter(
+    document = await db.scalar(select(models.EmployeeDocument).where(
         models.EmployeeDocument.document_id == document_id,
         models.EmployeeDocument.employee_id == employee_id
-    ).first()
+    ))
     
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
     
-    file_path = Path(document.document_path)
-    if not file_path.exists():
-        raise HTTPException(status_code=404, detail="Document file not found")
-    
-    return FileResponse(file_path)
+    return await serve_document(
+        request,
+        Path(document.document_path),
+        document.content_hash,
+        document.uploaded_at,
+        filename=document.original_filename,
+        media_type=document.content_type
+    )
 
 # Search endpoints
 @router.get("/departments/search/", response_model=List[schemas.Department])
-def search_departments(
+async def search_departments(
     query: str = Query(None, description="Search in title and description"),
-    db: Session = Depends(get_db)
+    mode: SearchMode = search_mode_param(),
+    stream: Optional[StreamFormat] = stream_param(),
+    db: AsyncSession = Depends(get_db)
 ):
-    search = f"%{query}%"
-    departments = db.query(models.Department).filter(
-        or_(
-            models.Department.title.ilike(search),
-            models.Department.description.ilike(search)
-        )
-    ).all()
-    return departments
+    departments = select(models.Department)
+    if query:
+        columns = [models.Department.title, models.Department.description]
+        departments = departments.filter(match_filter(columns, query, mode))
+        if mode == SearchMode.ranked:
+            departments = departments.order_by(rank_expression(columns, query).desc(), models.Department.department_id)
+    if stream:
+        return stream_rows(DEPARTMENT.project(departments), encode_with(DEPARTMENT), stream)
+    return (await db.scalars(departments)).all()
 
 @router.get("/positions/search/", response_model=List[schemas.Position])
-def search_positions(
+async def search_positions(
     title: Optional[str] = Query(None, description="Search by title"),
     min_salary: Optional[float] = Query(None, description="Minimum salary range"),
     max_salary: Optional[float] = Query(None, description="Maximum salary range"),
-    db: Session = Depends(get_db)
+    mode: SearchMode = search_mode_param(),
+    stream: Optional[StreamFormat] = stream_param(),
+    db: AsyncSession = Depends(get_db)
 ):
-    query = db.query(models.Position)
+    query = select(models.Position)
     
     if title:
-        query = query.filter(models.Position.title.ilike(f"%{title}%"))
+        query = query.filter(match_filter([models.Position.title], title, mode))
+        if mode == SearchMode.ranked:
+            query = query.order_by(rank_expression([models.Position.title], title).desc(), models.Position.position_id)
     if min_salary:
         query = query.filter(models.Position.salary_range_min >= min_salary)
     if max_salary:
         query = query.filter(models.Position.salary_range_max <= max_salary)
     
-    return query.all()
+    if stream:
+        return stream_rows(POSITION.project(query), encode_with(POSITION), stream)
+    return (await db.scalars(query)).all()
 
 @router.get("/employees/search/", response_model=List[schemas.Employee])
-def search_employees(
+async def search_employees(
     name: Optional[str] = Query(None, description="Search in first_name and last_name"),
     email: Optional[str] = Query(None, description="Search by email"),
     department_id: Optional[int] = Query(None, description="Filter by department"),
@@ -280,20 +534,21 @@ def search_employees(
     employment_type: Optional[str] = Query(None, description="Filter by employment type"),
     work_type: Optional[str] = Query(None, description="Filter by work type"),
     status: Optional[str] = Query(None, description="Filter by status"),
-    db: Session = Depends(get_db)
+    mode: SearchMode = search_mode_param(),
+    include: Optional[str] = include_param("documents"),
+    fields: Optional[str] = fields_param(),
+    fast: Optional[bool] = fast_json_param(),
+    stream: Optional[StreamFormat] = stream_param(),
+    db: AsyncSession = Depends(get_db)
 ):
-    query = db.query(models.Employee)
+    fields = parse_fields(fields)
+    query = select(models.Employee)
+    name_columns = [models.Employee.first_name, models.Employee.last_name]
     
     if name:
-        search = f"%{name}%"
-        query = query.filter(
-            or_(
-                models.Employee.first_name.ilike(search),
-                models.Employee.last_name.ilike(search)
-            )
-        )
+        query = query.filter(match_filter(name_columns, name, mode))
     if email:
-        query = query.filter(models.Employee.email.ilike(f"%{email}%"))
+        query = query.filter(match_filter([models.Employee.email], email, mode))
     if department_id:
         query = query.filter(models.Employee.department_id == department_id)
     if position_id:  # Changed from designation_id
@@ -304,12 +559,26 @@ def search_employees(
         query = query.filter(models.Employee.work_type == work_type)
     if status:
         query = query.filter(models.Employee.status == status)
+    if mode == SearchMode.ranked and (name or email):
+        rank = rank_expression(name_columns, name) if name else rank_expression([models.Employee.email], email)
+        query = query.order_by(rank.desc(), models.Employee.employee_id)
     
-    return query.all()
+    if stream:
+        parse_include(include, EMPLOYEE_INCLUDES)  # reject bad input while a 400 can still be sent
+
+        async def encode_batch(session: AsyncSession, rows):
+            return await employee_items(session, rows, include, fields)
+
+        columns = employee_columns(query, fields, [models.Employee.__table__.c.employee_id])
+        return stream_rows(columns, encode_batch, stream)
+    if fields or use_fast_json("search_employees", fast):
+        return await _fast_employees(db, query, include, fields)
+    return (await db.scalars(query.options(*employee_options(include)))).all()
 
 # Advanced search endpoint for employees with multiple fields and sorting
 @router.get("/employees/advanced-search/", response_model=List[schemas.Employee])
-def advanced_search_employees(
+async def advanced_search_employees(
+    response: Response,
     search: Optional[str] = Query(None, description="Global search across name, email, phone"),
     department_ids: Optional[List[int]] = Query(None, description="Filter by multiple departments"),
     position_ids: Optional[List[int]] = Query(None, description="Filter by multiple positions"),  # Changed from designation_ids
@@ -320,20 +589,25 @@ def advanced_search_employees(
     sort_desc: bool = Query(False, description="Sort in descending order"),
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    mode: SearchMode = search_mode_param(),
+    include: Optional[str] = include_param("documents"),
+    fields: Optional[str] = fields_param(),
+    fast: Optional[bool] = fast_json_param(),
+    db: AsyncSession = Depends(get_db)
 ):
-    query = db.query(models.Employee)
+    fields = parse_fields(fields)
+    fast = bool(fields) or use_fast_json("advanced_search_employees", fast)
+    query = select(models.Employee)
+    search_columns = [
+        models.Employee.first_name,
+        models.Employee.last_name,
+        models.Employee.email,
+        models.Employee.phone
+    ]
     
     if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            or_(
-                models.Employee.first_name.ilike(search_term),
-                models.Employee.last_name.ilike(search_term),
-                models.Employee.email.ilike(search_term),
-                models.Employee.phone.ilike(search_term)
-            )
-        )
+        query = query.filter(match_filter(search_columns, search, mode))
     
     if department_ids:
         query = query.filter(models.Employee.department_id.in_(department_ids))
@@ -346,11 +620,21 @@ def advanced_search_employees(
     if statuses:
         query = query.filter(models.Employee.status.in_(statuses))
     
-    # Dynamic sorting
-    sort_column = getattr(models.Employee, sort_by, models.Employee.last_name)
-    if sort_desc:
-        sort_column = sort_column.desc()
-    
-    query = query.order_by(sort_column)
+    # Relevance order replaces sort_by; rank scores are not seekable, so this mode pages by offset
+    if search and mode == SearchMode.ranked:
+        if cursor:
+            raise HTTPException(status_code=400, detail="Cursor pagination is not supported with ranked search")
+        query = query.order_by(rank_expression(search_columns, search).desc(), models.Employee.employee_id).offset(skip).limit(limit)
+        if fast:
+            return await _fast_employees(db, query, include, fields)
+        return (await db.scalars(query.options(*employee_options(include)))).all()
     
-    return query.offset(skip).limit(limit).all()
+    # Dynamic sorting, with employee_id as a tie-breaker so the cursor can seek past equal values
+    columns = models.Employee.__table__.c
+    sort_column = columns[sort_by] if sort_by in columns else columns.last_name
+    keyset = Keyset(sort_column, columns.employee_id, desc=sort_desc)
+    query = paginate(query, keyset, cursor, skip, limit)
+    if fast:
+        return await _fast_employees(db, query, include, fields, keyset, limit)
+    employees = (await db.scalars(query.options(*employee_options(include)))).all()
+    return page_rows(employees, keyset, limit, response)
@@ -1,103 +1,94 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from passlib.context import CryptContext
-from jose import jwt
-from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy import select, exists
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from fastapi.security import OAuth2PasswordRequestForm
 from ..database import get_db
 from ..models import models
 from ..schemas import schemas
+from ..pagination import Keyset, paginate, page_rows
+from ..hashing import get_password_hash, verify_password
+from ..writes import insert_returning, update_returning
+from ..auth import create_access_token, auth_gate, get_token_claims, get_current_user, revocations, user_cache
 
 router = APIRouter()
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-SECRET_KEY = "your-secret-key"  # Замените на свой ключ
-ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 60
-
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
-
-def get_password_hash(password):
-    return pwd_context.hash(password)
-
-def create_access_token(data: dict, expires_delta: timedelta = None):
-    to_encode = data.copy()
-    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-
-@router.post("/register", response_model=schemas.User)
-def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    db_user = db.query(models.User).filter(models.User.email == user.email).first()
-    if db_user:
-        raise HTTPException(status_code=400, detail="Email already registered")
-    hashed_password = get_password_hash(user.password)
-    db_user = models.User(
-        email=user.email,
-        name=user.name,
-        password=hashed_password
-    )
-    db.add(db_user)
+async def _insert_user(db: AsyncSession, user: schemas.UserCreate):
+    hashed_password = await get_password_hash(user.password)
     try:
-        db.commit()
-        db.refresh(db_user)
+        # users.email has no unique constraint; the duplicate check rides along in the INSERT ... SELECT
+        db_user = await insert_returning(
+            db, models.User,
+            {"email": user.email, "name": user.name, "password": hashed_password},
+            unless=exists().where(models.User.email == user.email)
+        )
+    except HTTPException:
+        raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
+    if db_user is None:
+        raise HTTPException(status_code=400, detail="Email already registered")
     return db_user
 
+@router.post("/register", response_model=schemas.User)
+async def register(user: schemas.UserCreate, db: AsyncSession = Depends(get_db)):
+    return await _insert_user(db, user)
+
 @router.post("/login")
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.password):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
+    user = await db.scalar(select(models.User).where(models.User.email == form_data.username))
+    verified, new_hash = (False, None)
+    if user:
+        verified, new_hash = await verify_password(user.email, form_data.password, user.password)
+    if not verified:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect email or password")
+    if new_hash:
+        # Work factor changed since this hash was made; upgrade it while we have the plaintext
+        user.password = new_hash
+        await db.commit()
     access_token = create_access_token(data={"sub": user.email})
     return {"access_token": access_token, "token_type": "bearer"}
 
-@router.post("/users/", response_model=schemas.User)
-def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    # Check if user with this email already exists
-    db_user = db.query(models.User).filter(models.User.email == user.email).first()
-    if db_user:
-        raise HTTPException(status_code=400, detail="Email already registered")
-    
-    # Create new user
-    hashed_password = get_password_hash(user.password)
-    db_user = models.User(
-        email=user.email,
-        name=user.name,
-        password=hashed_password
-    )
-    db.add(db_user)
-    try:
-        db.commit()
-        db.refresh(db_user)
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(status_code=500, detail=str(e))
-    return db_user
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(claims: dict = Depends(get_token_claims), db: AsyncSession = Depends(get_db)):
+    # Tokens issued before revocation support carry no jti; they simply run out
+    if claims.get("jti"):
+        await revocations.revoke(db, claims["jti"], claims["exp"])
+
+@router.get("/users/me", response_model=schemas.User)
+async def read_current_user(user: schemas.User = Depends(get_current_user)):
+    return user
+
+@router.post("/users/", response_model=schemas.User, dependencies=[Depends(auth_gate)])
+async def create_user(user: schemas.UserCreate, db: AsyncSession = Depends(get_db)):
+    return await _insert_user(db, user)
 
-@router.get("/users/{user_id}", response_model=schemas.User)
-def read_user(user_id: int, db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+@router.get("/users/{user_id}", response_model=schemas.User, dependencies=[Depends(auth_gate)])
+async def read_user(user_id: int, db: AsyncSession = Depends(get_db)):
+    user = await db.scalar(select(models.User).where(models.User.id == user_id))
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
-@router.get("/users/", response_model=List[schemas.User])
-def list_users(skip: int = 0, limit: int = 10, db: Session = Depends(get_db)):
-    users = db.query(models.User).offset(skip).limit(limit).all()
-    return users
+@router.get("/users/", response_model=List[schemas.User], dependencies=[Depends(auth_gate)])
+async def list_users(
+    response: Response,
+    skip: int = 0,
+    limit: int = 10,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    db: AsyncSession = Depends(get_db)
+):
+    keyset = Keyset(models.User.__table__.c.id, models.User.__table__.c.id)
+    users = (await db.scalars(paginate(select(models.User), keyset, cursor, skip, limit))).all()
+    return page_rows(users, keyset, limit, response)
 
-@router.put("/users/{user_id}", response_model=schemas.User)
-def update_user(user_id: int, user: schemas.UserCreate, db: Session = Depends(get_db)):
-    db_user = db.query(models.User).filter(models.User.id == user_id).first()
+@router.put("/users/{user_id}", response_model=schemas.User, dependencies=[Depends(auth_gate)])
+async def update_user(user_id: int, user: schemas.UserCreate, db: AsyncSession = Depends(get_db)):
+    values = user.dict()
+    values["password"] = await get_password_hash(values["password"])
+    db_user = await update_returning(db, models.User, models.User.id, user_id, values)
     if db_user is None:
         raise HTTPException(status_code=404, detail="User not found")
-    for key, value in user.dict().items():
-        setattr(db_user, key, value)
-    db.commit()
-    db.refresh(db_user)
+    user_cache.clear()  # the email a cached record is keyed by may have changed
     return db_user
\ No newline at end of file
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, EmailStr, validator
 from datetime import datetime, date
-from typing import Optional, List
+from typing import Dict, Optional, List, Union
 from enum import Enum
 import os
 
@@ -80,6 +80,10 @@ class EmployeeDocumentCreate(EmployeeDocumentBase):
 class EmployeeDocument(EmployeeDocumentBase):
     document_id: int
     employee_id: int
+    content_hash: Optional[str] = None
+    size_bytes: Optional[int] = None
+    original_filename: Optional[str] = None
+    content_type: Optional[str] = None
     uploaded_at: datetime
 
     class Config:
@@ -110,10 +114,11 @@ class EmployeeCreate(EmployeeBase):
 
 class Employee(EmployeeBase):
     employee_id: int
+    position_id: Optional[int] = None  # cleared when the position's department is deleted
     status: str
     created_at: datetime
     updated_at: datetime
-    documents: List['Document'] = []
+    documents: List[EmployeeDocument] = []  # Populated only when requested via ?include=documents
 
     class Config:
         from_attributes = True
@@ -160,6 +165,109 @@ class Document(DocumentBase):
     class Config:
         from_attributes = True
 
+class ImportRowError(BaseModel):
+    row: int  # 1-based data row number (CSV header excluded)
+    email: Optional[str] = None
+    errors: List[str]
+
+class EmployeeImportResult(BaseModel):
+    total: int
+    inserted: int
+    would_insert: Optional[int] = None  # dry runs only: rows that passed validation
+    failed: int
+    errors: List[ImportRowError]
+
+class EmployeePatch(EmployeeUpdate):
+    employee_id: int
+
+class EmployeeFilter(BaseModel):
+    employee_ids: Optional[List[int]] = None
+    department_ids: Optional[List[int]] = None
+    position_ids: Optional[List[int]] = None
+    statuses: Optional[List[str]] = None
+    employment_types: Optional[List[str]] = None
+    work_types: Optional[List[str]] = None
+
+class EmployeeBatchUpdate(BaseModel):
+    # Either per-employee patches...
+    updates: Optional[List[EmployeePatch]] = None
+    # ...or one patch applied to every employee matching the filter
+    filter: Optional[EmployeeFilter] = None
+    patch: Optional[EmployeeUpdate] = None
+
+class BatchUpdateItem(BaseModel):
+    employee_id: int
+    outcome: str  # updated, not_found, invalid
+    errors: List[str] = []
+    employee: Optional[Employee] = None
+
+class EmployeeBatchUpdateResult(BaseModel):
+    updated: int
+    not_found: int
+    invalid: int
+    results: List[BatchUpdateItem]
+
+class Job(BaseModel):
+    id: str
+    kind: str
+    status: str  # pending, running, succeeded, failed
+    params: Optional[dict] = None
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class ExpiringDocument(BaseModel):
+    document_id: int
+    employee_id: Optional[int] = None
+    title: str
+    type: str
+    number: Optional[str] = None
+    expiry_date: date
+    days_left: int  # negative once expired
+    scanned_at: datetime
+
+# Analytics
+class HeadcountGroup(BaseModel):
+    key: Optional[Union[int, str]] = None  # department/position id or enum value; None for unassigned
+    label: Optional[str] = None
+    headcount: int
+
+class PayrollGroup(HeadcountGroup):
+    ctc_total: float
+    ctc_avg: Optional[float] = None
+    monthly_salary_total: float
+    monthly_salary_avg: Optional[float] = None
+
+class StatusBreakdown(BaseModel):
+    department_id: Optional[int] = None
+    department: Optional[str] = None
+    total: int
+    statuses: Dict[str, int]
+
+class SalaryPercentiles(BaseModel):
+    key: Optional[Union[int, str]] = None
+    label: Optional[str] = None
+    count: int
+    min: Optional[float] = None
+    p25: Optional[float] = None
+    p50: Optional[float] = None
+    p75: Optional[float] = None
+    p90: Optional[float] = None
+    max: Optional[float] = None
+
+class AnalyticsSummary(BaseModel):
+    refreshed_at: Optional[datetime] = None
+    headcount: int
+    active_headcount: int
+    ctc_total: float
+    monthly_salary_total: float
+    statuses: Dict[str, int]
+    departments: List[PayrollGroup]
+
 class Token(BaseModel):
     access_token: str
     token_type: str
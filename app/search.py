@@ -0,0 +1,151 @@
+import enum
+import logging
+from typing import Sequence
+
+from fastapi import Query
+from sqlalchemy import case, func, literal, or_, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+
+logger = logging.getLogger(__name__)
+
+
+class SearchMode(str, enum.Enum):
+    contains = "contains"  # substring match
+    prefix = "prefix"  # fast autocomplete on the start of a value
+    ranked = "ranked"  # fuzzy match ordered by relevance
+
+
+# Text columns behind the search endpoints. Each gets a pg_trgm GIN index, which serves
+# ILIKE '%term%' as well as similarity ranking, plus a lower(col) text_pattern_ops B-tree
+# for the prefix-only autocomplete mode.
+SEARCH_COLUMNS = {
+    "employees": ("first_name", "last_name", "email", "phone"),
+    "departments": ("title", "description"),
+    "positions": ("title", "description"),
+}
+
+_trgm_available = False
+
+
+def trigram_enabled() -> bool:
+    return _trgm_available
+
+
+def search_mode_param():
+    return Query(
+        SearchMode.contains,
+        description="contains: substring match; prefix: fast autocomplete on the start of a value; "
+                    "ranked: fuzzy match ordered by relevance",
+    )
+
+
+def detect_trigram(engine) -> bool:
+    """Record whether pg_trgm is installed, without creating anything."""
+    global _trgm_available
+    if engine.dialect.name != "postgresql":
+        _trgm_available = False
+        return False
+    with engine.connect() as conn:
+        _trgm_available = conn.execute(
+            text("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')")
+        ).scalar()
+    return _trgm_available
+
+
+def ensure_search_indexes(engine) -> bool:
+    """Create the search indexes on Postgres and record whether pg_trgm is usable.
+
+    Without the extension (or on another database) searches fall back to plain
+    ILIKE/LIKE filters and a CASE-based ranking, so the endpoints keep working.
+    """
+    global _trgm_available
+    if engine.dialect.name != "postgresql":
+        _trgm_available = False
+        return False
+
+    try:
+        with engine.begin() as conn:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    except SQLAlchemyError as e:
+        logger.warning("Could not create pg_trgm extension: %s", e)
+
+    detect_trigram(engine)
+
+    for table, columns in SEARCH_COLUMNS.items():
+        for column in columns:
+            statements = [
+                f"CREATE INDEX IF NOT EXISTS ix_{table}_{column}_prefix "
+                f"ON {table} (lower({column}) text_pattern_ops)"
+            ]
+            if _trgm_available:
+                statements.append(
+                    f"CREATE INDEX IF NOT EXISTS ix_{table}_{column}_trgm "
+                    f"ON {table} USING gin ({column} gin_trgm_ops)"
+                )
+            for statement in statements:
+                try:
+                    with engine.begin() as conn:
+                        conn.execute(text(statement))
+                except SQLAlchemyError as e:
+                    logger.warning("Could not create search index on %s.%s: %s", table, column, e)
+
+    if not _trgm_available:
+        logger.warning("pg_trgm is unavailable; search falls back to unindexed ILIKE")
+    return _trgm_available
+
+
+def _escape_like(term: str) -> str:
+    # "/" rather than backslash, so the ESCAPE literal is unaffected by standard_conforming_strings
+    return term.replace("/", "//").replace("%", "/%").replace("_", "/_")
+
+
+def match_filter(columns: Sequence, term: str, mode: SearchMode):
+    """OR together a match of ``term`` against each column for the given mode."""
+    escaped = _escape_like(term)
+    if mode == SearchMode.prefix:
+        pattern = escaped.lower() + "%"
+        return or_(*[func.lower(column).like(pattern, escape="/") for column in columns])
+
+    pattern = f"%{escaped}%"
+    clauses = [column.ilike(pattern, escape="/") for column in columns]
+    if mode == SearchMode.ranked and _trgm_available:
+        # term <% column: word similarity above pg_trgm.word_similarity_threshold, so typos still match
+        clauses += [literal(term).op("<%")(column) for column in columns]
+    return or_(*clauses)
+
+
+class greatest(FunctionElement):
+    inherit_cache = True
+    name = "greatest"
+
+
+@compiles(greatest)
+def _compile_greatest(element, compiler, **kw):
+    return f"greatest({compiler.process(element.clauses, **kw)})"
+
+
+@compiles(greatest, "sqlite")
+def _compile_greatest_sqlite(element, compiler, **kw):
+    # SQLite spells the multi-argument scalar form max()
+    return f"max({compiler.process(element.clauses, **kw)})"
+
+
+def rank_expression(columns: Sequence, term: str):
+    if _trgm_available:
+        scores = [func.coalesce(func.word_similarity(term, column), 0) for column in columns]
+    else:
+        # Without trigrams: exact match beats prefix match beats substring match
+        lowered = term.lower()
+        escaped = _escape_like(lowered)
+        scores = [
+            case(
+                (func.lower(column) == lowered, 3),
+                (func.lower(column).like(escaped + "%", escape="/"), 2),
+                (func.lower(column).like(f"%{escaped}%", escape="/"), 1),
+                else_=0,
+            )
+            for column in columns
+        ]
+    return scores[0] if len(scores) == 1 else greatest(*scores)
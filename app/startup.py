@@ -0,0 +1,124 @@
+import asyncio
+import logging
+import time
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Optional
+
+import anyio
+from fastapi import FastAPI
+from sqlalchemy import text
+
+from .auth import revocations
+from .cache import response_cache
+from .config import settings
+from .database import AsyncSessionLocal, async_engine, init_db
+from .expiry import start_expiry_worker, stop_expiry_worker
+from .hashing import prewarm_executor, shutdown_executor
+from .storage import UPLOAD_DIR
+
+logger = logging.getLogger(__name__)
+
+READINESS_TIMEOUT = 2.0  # seconds a readiness probe waits for the database
+
+
+class StartupState:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.phase = "pending"  # pending -> warming -> ready
+        self.error: Optional[str] = None
+        self.attempts = 0
+        self.started_at = time.monotonic()
+        self.ready_after: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.phase == "ready"
+
+
+state = StartupState()
+_warmup: Optional[asyncio.Task] = None
+
+
+async def prewarm_pool(count: int):
+    # Hold every connection at once so the pool really ends up with ``count`` open ones
+    async with AsyncExitStack() as stack:
+        for _ in range(count):
+            connection = await stack.enter_async_context(async_engine.connect())
+            await connection.execute(text("SELECT 1"))
+
+
+async def prewarm_caches():
+    # Fill the first pages every client asks for; the handlers own the cache keys
+    from .routes.hr_router import list_departments, list_positions
+    async with AsyncSessionLocal() as session:
+        await list_departments(skip=0, limit=100, cursor=None, if_none_match=None, db=session)
+        await list_positions(skip=0, limit=100, cursor=None, if_none_match=None, db=session)
+    if settings.ANALYTICS_SUMMARY:
+        from .analytics import ensure_fresh_summary
+        async with AsyncSessionLocal() as session:
+            await ensure_fresh_summary(session)
+
+
+async def _warm_up():
+    await anyio.to_thread.run_sync(lambda: UPLOAD_DIR.mkdir(parents=True, exist_ok=True))
+    while True:
+        state.attempts += 1
+        try:
+            await anyio.to_thread.run_sync(init_db)
+            break
+        except Exception as e:
+            # Keep the worker alive but unready; the load balancer routes around it
+            state.error = str(e)
+            logger.error("Database initialization failed (attempt %d): %s", state.attempts, e)
+            await asyncio.sleep(settings.STARTUP_RETRY_INTERVAL)
+
+    state.phase = "warming"
+    steps = [("connection pool", prewarm_pool(min(settings.DB_POOL_PREWARM, max(settings.DB_POOL_SIZE, 1)))),
+             ("password hashing", prewarm_executor()),
+             ("token revocations", revocations.sync())]
+    if settings.STARTUP_PREWARM_CACHES:
+        steps.append(("caches", prewarm_caches()))
+    for name, step in steps:
+        try:
+            await step
+        except Exception as e:
+            # A cold cache or pool only costs latency; it does not keep the worker out of rotation
+            logger.warning("Could not pre-warm %s: %s", name, e)
+
+    start_expiry_worker()
+    response_cache.start_listener()
+    state.error = None
+    state.phase = "ready"
+    state.ready_after = round(time.monotonic() - state.started_at, 3)
+    logger.info("Worker ready after %.2fs", state.ready_after)
+
+
+async def readiness() -> dict:
+    report = {"ready": state.ready, "phase": state.phase, "attempts": state.attempts, "error": state.error}
+    if state.ready:
+        try:
+            with anyio.fail_after(READINESS_TIMEOUT):
+                async with async_engine.connect() as connection:
+                    await connection.execute(text("SELECT 1"))
+        except Exception as e:
+            report.update(ready=False, error=f"database: {str(e) or type(e).__name__}")
+    return report
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start serving at once and warm up in the background; /health/ready reports when done."""
+    global _warmup
+    state.reset()
+    _warmup = asyncio.create_task(_warm_up())
+    try:
+        yield
+    finally:
+        _warmup.cancel()
+        await asyncio.gather(_warmup, return_exceptions=True)
+        await stop_expiry_worker()
+        shutdown_executor()
+        await response_cache.close()
+        await async_engine.dispose()
@@ -0,0 +1,266 @@
+import asyncio
+import hashlib
+import os
+import weakref
+from contextlib import AsyncExitStack, asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from pathlib import Path
+from typing import AsyncIterator, Optional
+from uuid import uuid4
+
+import anyio
+from fastapi import HTTPException, Request, Response, UploadFile
+from fastapi.responses import FileResponse
+from fastapi.routing import APIRoute
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import settings
+from .metrics import metrics
+
+UPLOAD_DIR = Path(settings.UPLOAD_DIR)
+BLOB_DIR = UPLOAD_DIR / "blobs"
+TMP_DIR = UPLOAD_DIR / "tmp"
+CHUNK_SIZE = 1024 * 1024
+# Room for multipart boundaries and form fields on top of the file itself
+MULTIPART_OVERHEAD = 64 * 1024
+# Arbitrary constant; first key of the two-key advisory locks taken per blob on Postgres
+BLOB_LOCK_NAMESPACE = 72410305
+
+_blob_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+
+@dataclass
+class StoredBlob:
+    sha256: str
+    size: int
+    path: Path
+    # The upload's own copy when the content was already stored; kept until the new row is committed
+    spare: Optional[Path] = None
+
+    def ensure_stored(self):
+        """Put the blob back from the spare copy if a purge removed it since the upload (blocking)."""
+        if self.spare is not None and not self.path.exists():
+            _move_into_place(self.spare, self.path)
+            self.spare = None
+
+    def discard_spare(self):
+        if self.spare is not None:
+            self.spare.unlink(missing_ok=True)
+            self.spare = None
+
+
+def blob_path(sha256: str) -> Path:
+    # Two levels of sharding keep directories small: blobs/ab/cd/abcd...
+    return BLOB_DIR / sha256[:2] / sha256[2:4] / sha256
+
+
+def _too_large() -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"File exceeds the {settings.MAX_UPLOAD_BYTES} byte upload limit"
+    )
+
+
+def _move_into_place(tmp_path: Path, final_path: Path) -> None:
+    while True:
+        final_path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.replace(tmp_path, final_path)
+            return
+        except FileNotFoundError:
+            # remove_files pruned the shard directory in between; make it again
+            if not tmp_path.exists():
+                raise
+
+
+def _commit_blob(tmp_path: Path, final_path: Path) -> Optional[Path]:
+    if final_path.exists():
+        # Identical content is already stored; keep the existing blob, and our copy as a spare
+        return tmp_path
+    _move_into_place(tmp_path, final_path)
+    return None
+
+
+async def store_stream(chunks: AsyncIterator[bytes]) -> StoredBlob:
+    """Write chunks to the blob store, hashing as they arrive.
+
+    Data goes to a temp file first and is renamed to its content address once
+    the digest is known, so concurrent identical uploads converge on one blob.
+    """
+    await anyio.to_thread.run_sync(lambda: TMP_DIR.mkdir(parents=True, exist_ok=True))
+    tmp_path = TMP_DIR / uuid4().hex
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async with await anyio.open_file(tmp_path, "wb") as buffer:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > settings.MAX_UPLOAD_BYTES:
+                    raise _too_large()
+                digest.update(chunk)
+                await buffer.write(chunk)
+        sha256 = digest.hexdigest()
+        final_path = blob_path(sha256)
+        spare = await anyio.to_thread.run_sync(_commit_blob, tmp_path, final_path)
+    except BaseException:
+        await anyio.to_thread.run_sync(lambda: tmp_path.unlink(missing_ok=True))
+        raise
+    metrics.observe_upload(size)
+    return StoredBlob(sha256=sha256, size=size, path=final_path, spare=spare)
+
+
+@asynccontextmanager
+async def blob_lock(session: AsyncSession, *hashes: str):
+    """Serialize adding references to blobs with removing them; commit ``session`` inside the block.
+
+    Uploads hold it from the dedupe check to the committed insert, orphan cleanup
+    from the reference check to the unlink, so a blob is never removed under a
+    row that is about to point at it. Across workers this is a transaction-level
+    advisory lock on Postgres, released by that commit.
+    """
+    async with AsyncExitStack() as stack:
+        # Sorted, so two holders of several locks always take them in the same order
+        for sha256 in sorted(set(hashes)):
+            lock = _blob_locks.get(sha256)
+            if lock is None:
+                lock = _blob_locks[sha256] = asyncio.Lock()
+            await stack.enter_async_context(lock)
+        if session.get_bind().dialect.name == "postgresql":
+            for sha256 in sorted(set(hashes)):
+                # Signed 32-bit second key from the digest; a collision only serializes two unrelated blobs
+                key = int(sha256[:8], 16) - 2 ** 31
+                await session.execute(text("SELECT pg_advisory_xact_lock(:namespace, :key)"),
+                                      {"namespace": BLOB_LOCK_NAMESPACE, "key": key})
+        yield
+
+
+async def iter_upload(file: UploadFile) -> AsyncIterator[bytes]:
+    while True:
+        chunk = await file.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        yield chunk
+
+
+def _prune_shards(path: Path) -> None:
+    # blobs/ab/cd/ once the last blob in it is gone, then blobs/ab/; legacy files are left alone
+    if path.parent.parent.parent != BLOB_DIR:
+        return
+    for directory in (path.parent, path.parent.parent):
+        try:
+            directory.rmdir()
+        except OSError:  # not empty, or already gone
+            return
+
+
+def remove_files(paths) -> int:
+    """Unlink stored files (blocking; run in a thread). Returns how many were removed.
+
+    Blob shard directories left empty go too.
+    """
+    removed = 0
+    for path in map(Path, paths):
+        try:
+            path.unlink()
+            removed += 1
+        except FileNotFoundError:
+            continue
+        _prune_shards(path)
+    return removed
+
+
+class UploadLimitRoute(APIRoute):
+    """Rejects oversized uploads from Content-Length before FastAPI parses the body."""
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def limited_handler(request: Request):
+            length = request.headers.get("content-length")
+            if length and length.isdigit() and int(length) > settings.MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD:
+                raise _too_large()
+            return await handler(request)
+
+        return limited_handler
+
+
+# Documents are personal data: browsers may keep a private copy but must revalidate,
+# which is a cheap 304 when the ETag still matches
+DOWNLOAD_CACHE_CONTROL = "private, no-cache"
+
+
+def _http_date(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match uses weak comparison: W/"x" matches "x"
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def _not_modified_since(if_modified_since: str, last_modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    if last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    # HTTP dates have one-second resolution
+    return last_modified.replace(microsecond=0) <= since
+
+
+async def serve_document(
+    request: Request,
+    path: Path,
+    content_hash: Optional[str],
+    uploaded_at: Optional[datetime],
+    filename: Optional[str] = None,
+    media_type: Optional[str] = None
+) -> Response:
+    """Serve a stored document with validators, conditional GET and byte ranges.
+
+    Content-addressed documents get a strong ETag straight from the stored
+    SHA-256, so a matching If-None-Match or If-Modified-Since is answered with
+    304 before the file is touched. Range/If-Range requests (206) and
+    zero-copy sends via the ASGI pathsend extension are handled by FileResponse.
+    """
+    headers = {"Cache-Control": DOWNLOAD_CACHE_CONTROL}
+    if content_hash:
+        headers["ETag"] = f'"{content_hash}"'
+        if uploaded_at:
+            headers["Last-Modified"] = _http_date(uploaded_at)
+
+        if_none_match = request.headers.get("if-none-match")
+        if_modified_since = request.headers.get("if-modified-since")
+        # If-Modified-Since is ignored when If-None-Match is present (RFC 9110 13.1.3)
+        if if_none_match is not None:
+            not_modified = etag_matches(if_none_match, headers["ETag"])
+        else:
+            not_modified = bool(if_modified_since and uploaded_at and _not_modified_since(if_modified_since, uploaded_at))
+        if not_modified:
+            return Response(status_code=304, headers=headers)
+
+    try:
+        stat_result = await anyio.to_thread.run_sync(os.stat, path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Document file not found")
+
+    # Legacy uploads keep FileResponse's own mtime/size based ETag and Last-Modified
+    return FileResponse(
+        path,
+        stat_result=stat_result,
+        headers=headers,
+        media_type=media_type,
+        filename=filename,
+        content_disposition_type="inline"
+    )
@@ -0,0 +1,77 @@
+import enum
+import logging
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Sequence
+
+from fastapi import Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import settings
+from .database import AsyncSessionLocal
+from .fastjson import dumps
+
+logger = logging.getLogger(__name__)
+
+# Turns one fetched batch of column rows into response dicts; may run extra queries on the session
+EncodeBatch = Callable[[AsyncSession, Sequence], Awaitable[List[dict]]]
+
+
+class StreamFormat(str, enum.Enum):
+    ndjson = "ndjson"  # one JSON object per line
+    json = "json"  # the usual JSON array, sent in chunks
+
+
+MEDIA_TYPES = {
+    StreamFormat.ndjson: "application/x-ndjson",
+    StreamFormat.json: "application/json",
+}
+
+
+def stream_param():
+    return Query(
+        None,
+        description="Stream every match through a server-side cursor instead of building the whole list: "
+                    "ndjson (one object per line) or json (chunked array)",
+    )
+
+
+async def _chunks(query, encode_batch: EncodeBatch, format: StreamFormat) -> AsyncIterator[bytes]:
+    # Own session: the request's session is closed once the handler returns, before the body is sent
+    async with AsyncSessionLocal() as session:
+        result = await session.stream(query.execution_options(yield_per=settings.STREAM_BATCH_SIZE))
+        first = True
+        if format == StreamFormat.json:
+            yield b"["
+        try:
+            async for rows in result.partitions():
+                items = await encode_batch(session, rows)
+                if format == StreamFormat.ndjson:
+                    yield b"".join(dumps(item) + b"\n" for item in items)
+                else:
+                    body = b",".join(dumps(item) for item in items)
+                    yield body if first else b"," + body
+                first = False
+        except Exception:
+            # Headers are already sent; the client sees a truncated body
+            logger.exception("Streaming response aborted")
+            raise
+        finally:
+            await result.close()
+        if format == StreamFormat.json:
+            yield b"]"
+
+
+def stream_rows(query, encode_batch: EncodeBatch, format: StreamFormat) -> StreamingResponse:
+    """Send the rows of a column ``query`` as they are fetched, ``STREAM_BATCH_SIZE`` at a time.
+
+    Memory stays bounded by one batch however many rows match. Validate
+    request parameters before calling this: errors after the first chunk can no
+    longer become a 4xx.
+    """
+    return StreamingResponse(_chunks(query, encode_batch, format), media_type=MEDIA_TYPES[format])
+
+
+def encode_with(encoder) -> EncodeBatch:
+    async def encode_batch(session: AsyncSession, rows: Sequence) -> List[dict]:
+        return [encoder.encode(row) for row in rows]
+    return encode_batch
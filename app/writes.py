@@ -0,0 +1,115 @@
+from typing import Dict, Optional, Sequence
+
+from fastapi import HTTPException, status
+from sqlalchemy import insert, literal, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Postgres SQLSTATE codes; SQLite only reports them in the message
+FOREIGN_KEY_VIOLATION = "23503"
+UNIQUE_VIOLATION = "23505"
+REFERENCE_NOT_FOUND = "Referenced record not found"
+
+
+def _sqlstate(error: IntegrityError) -> Optional[str]:
+    return getattr(error.orig, "sqlstate", None) or getattr(error.orig, "pgcode", None)
+
+
+def integrity_error(
+    error: IntegrityError,
+    references: Optional[Dict[str, str]] = None,
+    conflicts: Optional[Dict[str, str]] = None
+) -> HTTPException:
+    """Turn a constraint violation into the 404/409 the old pre-checks used to raise.
+
+    ``references`` maps foreign key columns to their "not found" message and
+    ``conflicts`` maps unique columns to their "already exists" message; the
+    column is recognised from the constraint name or SQLite's message.
+    """
+    message = str(error.orig)
+    code = _sqlstate(error)
+    if code == FOREIGN_KEY_VIOLATION or "FOREIGN KEY" in message:
+        candidates, status_code, fallback = references or {}, status.HTTP_404_NOT_FOUND, REFERENCE_NOT_FOUND
+    elif code == UNIQUE_VIOLATION or "UNIQUE" in message:
+        candidates, status_code, fallback = conflicts or {}, status.HTTP_409_CONFLICT, "Record already exists"
+    else:
+        return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=message)
+
+    for column, detail in candidates.items():
+        if column in message:
+            return HTTPException(status_code=status_code, detail=detail)
+    # SQLite does not say which constraint failed
+    if len(candidates) == 1:
+        return HTTPException(status_code=status_code, detail=next(iter(candidates.values())))
+    return HTTPException(status_code=status_code, detail=fallback)
+
+
+def _returning(statement, model, options: Sequence):
+    # populate_existing: an instance already in the session takes the returned values
+    return statement.returning(model).options(*options).execution_options(populate_existing=True)
+
+
+async def _missing_reference(db: AsyncSession, model, values: dict, references: Dict[str, str]) -> Optional[str]:
+    # Failure path only: find which referenced row is absent by following each column's ForeignKey
+    for column_name, detail in references.items():
+        value = values.get(column_name)
+        if value is None:
+            continue
+        for foreign_key in model.__table__.c[column_name].foreign_keys:
+            if not await db.scalar(select(foreign_key.column).where(foreign_key.column == value)):
+                return detail
+    return None
+
+
+async def _execute(db: AsyncSession, statement, model, values: dict, references, conflicts):
+    try:
+        instance = await db.scalar(statement)
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        error = integrity_error(e, references, conflicts)
+        if error.detail == REFERENCE_NOT_FOUND and references:
+            error.detail = await _missing_reference(db, model, values, references) or error.detail
+        raise error
+    return instance
+
+
+async def insert_returning(
+    db: AsyncSession,
+    model,
+    values: dict,
+    options: Sequence = (),
+    unless=None,
+    references: Optional[Dict[str, str]] = None,
+    conflicts: Optional[Dict[str, str]] = None
+):
+    """INSERT ... RETURNING the new row as an instance, then commit.
+
+    ``unless`` is a condition (e.g. a matching row already exists) that makes the
+    statement insert nothing, in which case None is returned.
+    """
+    if unless is None:
+        statement = insert(model).values(**values)
+    else:
+        columns = model.__table__.c
+        row = select(*(literal(value, columns[key].type).label(key) for key, value in values.items()))
+        statement = insert(model).from_select(list(values), row.where(~unless))
+    return await _execute(db, _returning(statement, model, options), model, values, references, conflicts)
+
+
+async def update_returning(
+    db: AsyncSession,
+    model,
+    key_column,
+    key,
+    values: dict,
+    options: Sequence = (),
+    references: Optional[Dict[str, str]] = None,
+    conflicts: Optional[Dict[str, str]] = None
+):
+    """UPDATE ... WHERE key RETURNING the row, then commit; None when no row matched."""
+    if not values:
+        return await db.scalar(select(model).options(*options).where(key_column == key))
+    statement = _returning(update(model).where(key_column == key).values(**values), model, options)
+    statement = statement.execution_options(synchronize_session=False)
+    return await _execute(db, statement, model, values, references, conflicts)
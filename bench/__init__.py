@@ -0,0 +1,26 @@
+"""Benchmarks for the HR API: ``python -m bench.seed`` builds a synthetic org, ``python -m bench.run`` measures it.
+
+Both read the app's own settings (.env / environment). Without DATABASE_URL they
+use a SQLite file next to this package, so a run needs no server and no Postgres;
+set DATABASE_URL to a throwaway Postgres database for numbers close to production.
+Their extra dependencies are in requirements-bench.txt.
+"""
+import os
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+EMAIL_DOMAIN = "bench.example"
+DEFAULT_PASSWORD = "bench-password"
+
+
+def user_email(index: int) -> str:
+    return f"bench-user{index}@{EMAIL_DOMAIN}"
+
+
+def configure_environment():
+    """Fill in settings the app requires before it is imported; explicit environment values win."""
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{BENCH_DIR / 'bench.db'}")
+    os.environ.setdefault("UPLOAD_DIR", str(BENCH_DIR / "uploads"))
+    # Only used to build the default Postgres URL, which DATABASE_URL replaces
+    for name in ("DB_HOST", "DB_PORT", "DB_NAME", "DB_USER", "DB_PASSWORD"):
+        os.environ.setdefault(name, "bench")
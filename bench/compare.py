@@ -0,0 +1,84 @@
+"""Diff two saved benchmark runs.
+
+    python -m bench.compare bench/results/baseline.json bench/results/current.json --threshold 0.2
+
+Exits 1 when a scenario regressed: p95 latency up or throughput down by more than
+the threshold, more queries per request, or more failed requests.
+"""
+import argparse
+import json
+import sys
+from typing import List
+
+# Mean queries per request may wobble by a fraction (cache hits, background refreshes); a whole query more is real
+QUERY_TOLERANCE = 0.5
+
+
+def load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def _change(old: float, new: float) -> float:
+    return (new - old) / old if old else 0.0
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.2) -> List[dict]:
+    rows = []
+    for name, new in current["scenarios"].items():
+        old = baseline["scenarios"].get(name)
+        if old is None:
+            continue
+        row = {
+            "scenario": name,
+            "p50": _change(old["latency_ms"]["p50"], new["latency_ms"]["p50"]),
+            "p95": _change(old["latency_ms"]["p95"], new["latency_ms"]["p95"]),
+            "p99": _change(old["latency_ms"]["p99"], new["latency_ms"]["p99"]),
+            "throughput": _change(old["throughput_rps"], new["throughput_rps"]),
+            "queries": new["queries_per_request"]["mean"] - old["queries_per_request"]["mean"],
+            "errors": new["errors"] - old["errors"],
+        }
+        regressions = []
+        if row["p95"] > threshold:
+            regressions.append("p95")
+        if row["throughput"] < -threshold:
+            regressions.append("throughput")
+        if row["queries"] > QUERY_TOLERANCE:
+            regressions.append("queries")
+        if row["errors"] > 0:
+            regressions.append("errors")
+        row["regressions"] = regressions
+        rows.append(row)
+    return rows
+
+
+def print_comparison(baseline: dict, current: dict, threshold: float = 0.2) -> bool:
+    """Print the diff table; True if anything regressed."""
+    for key in ("database", "dataset"):
+        if baseline["meta"].get(key) != current["meta"].get(key):
+            print(f"warning: {key} differs from the baseline, so the numbers are not directly comparable")
+    rows = compare(baseline, current, threshold)
+    print(f"{'scenario':<18} {'p50':>8} {'p95':>8} {'p99':>8} {'rps':>8} {'q/req':>7}  regressed")
+    for row in rows:
+        print(
+            f"{row['scenario']:<18} {row['p50']:>+8.1%} {row['p95']:>+8.1%} {row['p99']:>+8.1%} "
+            f"{row['throughput']:>+8.1%} {row['queries']:>+7.2f}  {', '.join(row['regressions']) or '-'}"
+        )
+    missing = sorted(set(baseline["scenarios"]) - set(current["scenarios"]))
+    if missing:
+        print(f"not run this time: {', '.join(missing)}")
+    return any(row["regressions"] for row in rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bench.compare", description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative change that counts as a regression")
+    args = parser.parse_args(argv)
+    regressed = print_comparison(load(args.baseline), load(args.current), args.threshold)
+    sys.exit(1 if regressed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""The bench.run scenarios against a running server, for multi-worker and over-the-network load.
+
+    locust -f bench/locustfile.py --host http://localhost:8000
+
+Seed the server's database with ``python -m bench.seed`` first. Locust reports the
+latency percentiles and throughput; queries per request come from the server's
+/metrics (METRICS_ENABLED=true). Locust is not an app dependency: it is in requirements-bench.txt.
+"""
+import os
+import random
+
+from locust import HttpUser, between, task
+
+USERS = int(os.environ.get("BENCH_USERS", "10"))
+PASSWORD = os.environ.get("BENCH_PASSWORD", "bench-password")
+PAGE_SIZE = 50
+PAGES = 20
+UPLOAD_KB = int(os.environ.get("BENCH_UPLOAD_KB", "64"))
+SEARCH_TERMS = ["Brow", "Chen", "Garc", "Ivan", "Kim", "Lope", "Petr", "Tana"]
+
+
+class HRUser(HttpUser):
+    wait_time = between(0.1, 0.5)
+
+    def on_start(self):
+        self.login()
+        employees = self.client.get("/hr/employees/", params={"limit": 500}, name="/hr/employees/ (setup)").json()
+        self.employee_ids = [employee["employee_id"] for employee in employees]
+        self.department_ids = sorted({employee["department_id"] for employee in employees if employee["department_id"]})
+        self.downloads = []
+        self.upload()
+
+    @task(1)
+    def login(self):
+        response = self.client.post("/login", data={
+            "username": f"bench-user{random.randrange(USERS)}@bench.example", "password": PASSWORD,
+        })
+        if response.ok:
+            self.client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+
+    @task(10)
+    def list_employees(self):
+        skip = random.randrange(PAGES) * PAGE_SIZE
+        self.client.get("/hr/employees/", params={"skip": skip, "limit": PAGE_SIZE}, name="/hr/employees/")
+
+    @task(10)
+    def get_employee(self):
+        self.client.get(f"/hr/employees/{random.choice(self.employee_ids)}", name="/hr/employees/{id}")
+
+    @task(5)
+    def advanced_search(self):
+        params = {
+            "search": random.choice(SEARCH_TERMS),
+            "department_ids": random.sample(self.department_ids, min(3, len(self.department_ids))),
+            "statuses": "active",
+            "limit": PAGE_SIZE,
+        }
+        self.client.get("/hr/employees/advanced-search/", params=params, name="/hr/employees/advanced-search/")
+
+    @task(5)
+    def list_departments(self):
+        self.client.get("/hr/departments/")
+
+    @task(1)
+    def upload(self):
+        response = self.client.post(
+            f"/hr/employees/{random.choice(self.employee_ids)}/documents/",
+            data={"document_type": "contract"},
+            files={"file": ("bench.bin", os.urandom(UPLOAD_KB * 1024), "application/octet-stream")},
+            name="/hr/employees/{id}/documents/ (upload)",
+        )
+        if response.ok:
+            document = response.json()
+            self.downloads.append((document["employee_id"], document["document_id"]))
+
+    @task(3)
+    def download(self):
+        if self.downloads:
+            employee_id, document_id = random.choice(self.downloads)
+            self.client.get(f"/hr/employees/{employee_id}/documents/{document_id}",
+                            name="/hr/employees/{id}/documents/{document_id}")
@@ -0,0 +1,309 @@
+"""Drive the real app in-process and report latency, throughput and queries per request.
+
+    python -m bench.run --requests 500 --concurrency 16 --save bench/results/baseline.json
+    python -m bench.run --baseline bench/results/baseline.json  # exits 1 on a regression
+
+Requests go through httpx's ASGI transport, so routing, middleware, dependencies
+and the database are all exercised but the network is not. The lifespan runs as
+under uvicorn and every scenario starts once /health/ready answers 200. Absolute
+numbers depend on the machine: diff runs made on the same one.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import time
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from . import BENCH_DIR, DEFAULT_PASSWORD, EMAIL_DOMAIN, configure_environment
+
+configure_environment()
+
+import httpx  # noqa: E402
+from sqlalchemy import event, func, select  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.database import AsyncSessionLocal, async_engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import models  # noqa: E402
+
+from .compare import load, print_comparison  # noqa: E402
+from .seed import LAST_NAMES  # noqa: E402
+
+# Settings that change what a run measures; saved with the results
+RECORDED_SETTINGS = (
+    "FAST_JSON_ENDPOINTS", "CACHE_BACKEND", "COMPRESSION_MINIMUM_SIZE", "AUTH_REQUIRED", "DB_POOL_SIZE",
+    "BCRYPT_ROUNDS", "HASH_WORKERS",
+)
+
+_queries: ContextVar[Optional[List[int]]] = ContextVar("bench_queries", default=None)
+
+
+@event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    # The ASGI transport runs the app in the caller's task, so the request sees the counter set around it
+    counter = _queries.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+class Context:
+    def __init__(self, client: httpx.AsyncClient, args):
+        self.client = client
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.dataset: Dict[str, int] = {}
+        self.employee_ids: List[int] = []
+        self.department_ids: List[int] = []
+        self.users: List[str] = []
+        self.downloads: List[tuple] = []  # (employee_id, document_id) uploaded during setup
+
+    def payload(self) -> bytes:
+        # Fresh bytes every time: identical content would only hit the upload deduplication
+        return os.urandom(self.args.upload_kb * 1024)
+
+
+SCENARIOS: Dict[str, Callable] = {}
+
+
+def scenario(name: str):
+    def register(fn):
+        SCENARIOS[name] = fn
+        return fn
+    return register
+
+
+@scenario("login")
+async def login(ctx: Context) -> httpx.Response:
+    return await ctx.client.post("/login", data={"username": ctx.rng.choice(ctx.users), "password": ctx.args.password})
+
+
+@scenario("list_employees")
+async def list_employees(ctx: Context) -> httpx.Response:
+    page = ctx.rng.randrange(ctx.args.pages)
+    return await ctx.client.get("/hr/employees/", params={"skip": page * ctx.args.page_size, "limit": ctx.args.page_size})
+
+
+@scenario("get_employee")
+async def get_employee(ctx: Context) -> httpx.Response:
+    return await ctx.client.get(f"/hr/employees/{ctx.rng.choice(ctx.employee_ids)}")
+
+
+@scenario("advanced_search")
+async def advanced_search(ctx: Context) -> httpx.Response:
+    params = {
+        "search": ctx.rng.choice(LAST_NAMES)[:4],
+        "department_ids": ctx.rng.sample(ctx.department_ids, min(3, len(ctx.department_ids))),
+        "statuses": "active",
+        "limit": ctx.args.page_size,
+    }
+    return await ctx.client.get("/hr/employees/advanced-search/", params=params)
+
+
+@scenario("list_departments")
+async def list_departments(ctx: Context) -> httpx.Response:
+    return await ctx.client.get("/hr/departments/")
+
+
+@scenario("upload")
+async def upload(ctx: Context) -> httpx.Response:
+    return await ctx.client.post(
+        f"/hr/employees/{ctx.rng.choice(ctx.employee_ids)}/documents/",
+        data={"document_type": "contract"},
+        files={"file": ("bench.bin", ctx.payload(), "application/octet-stream")},
+    )
+
+
+@scenario("download")
+async def download(ctx: Context) -> httpx.Response:
+    employee_id, document_id = ctx.rng.choice(ctx.downloads)
+    return await ctx.client.get(f"/hr/employees/{employee_id}/documents/{document_id}")
+
+
+def percentile(ordered: List[float], p: float) -> float:
+    # Nearest rank: always a latency that was actually observed
+    return ordered[max(math.ceil(p / 100 * len(ordered)) - 1, 0)]
+
+
+async def _timed(fn: Callable, ctx: Context):
+    counter = [0]
+    token = _queries.set(counter)
+    started = time.perf_counter()
+    try:
+        response = await fn(ctx)
+    finally:
+        elapsed = time.perf_counter() - started
+        _queries.reset(token)
+    return elapsed * 1000, response.status_code, counter[0]
+
+
+async def run_scenario(ctx: Context, fn: Callable) -> dict:
+    for _ in range(ctx.args.warmup):
+        await fn(ctx)
+    latencies, queries, statuses = [], [], Counter()
+    remaining = iter(range(ctx.args.requests))
+
+    async def worker():
+        # Each worker is one client sending its next request as soon as the last one answered
+        for _ in remaining:
+            elapsed_ms, status_code, count = await _timed(fn, ctx)
+            latencies.append(elapsed_ms)
+            queries.append(count)
+            statuses[status_code] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(ctx.args.concurrency)))
+    wall = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": sum(count for status_code, count in statuses.items() if status_code >= 400),
+        "statuses": {str(status_code): count for status_code, count in sorted(statuses.items())},
+        "throughput_rps": round(len(latencies) / wall, 2),
+        "latency_ms": {
+            "mean": round(sum(latencies) / len(latencies), 3),
+            "p50": round(percentile(latencies, 50), 3),
+            "p95": round(percentile(latencies, 95), 3),
+            "p99": round(percentile(latencies, 99), 3),
+            "max": round(latencies[-1], 3),
+        },
+        "queries_per_request": {"mean": round(sum(queries) / len(queries), 3), "max": max(queries)},
+    }
+
+
+async def _wait_ready(client: httpx.AsyncClient, timeout: float):
+    deadline = time.monotonic() + timeout
+    while True:
+        response = await client.get("/health/ready")
+        if response.status_code == 200:
+            return
+        if time.monotonic() > deadline:
+            raise SystemExit(f"App not ready after {timeout:g}s: {response.text}")
+        await asyncio.sleep(0.1)
+
+
+async def _load_dataset(ctx: Context, names: List[str]):
+    async with AsyncSessionLocal() as session:
+        for key, model in (("departments", models.Department), ("positions", models.Position),
+                           ("employees", models.Employee), ("documents", models.Document)):
+            ctx.dataset[key] = await session.scalar(select(func.count()).select_from(model))
+        ctx.employee_ids = list(await session.scalars(select(models.Employee.employee_id)))
+        ctx.department_ids = list(await session.scalars(select(models.Department.department_id)))
+        ctx.users = list(await session.scalars(
+            select(models.User.email).where(models.User.email.like(f"%@{EMAIL_DOMAIN}")).order_by(models.User.email)
+        ))
+    if not ctx.employee_ids:
+        raise SystemExit("The benchmark database is empty: run `python -m bench.seed` first")
+    if not ctx.users and ("login" in names or settings.AUTH_REQUIRED):
+        raise SystemExit("No benchmark users: run `python -m bench.seed --users 10` first")
+
+
+async def _setup(ctx: Context, names: List[str]):
+    await _load_dataset(ctx, names)
+    if ctx.users:
+        response = await login(ctx)
+        response.raise_for_status()
+        ctx.client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+    if "download" in names:
+        # Untimed uploads, so the download scenario measures serving stored files only
+        for _ in range(ctx.args.download_files):
+            response = await upload(ctx)
+            response.raise_for_status()
+            document = response.json()
+            ctx.downloads.append((document["employee_id"], document["document_id"]))
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _print_results(results: dict):
+    print(f"{'scenario':<18} {'reqs':>6} {'errors':>6} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'q/req':>6}")
+    for name, result in results["scenarios"].items():
+        latency = result["latency_ms"]
+        print(
+            f"{name:<18} {result['requests']:>6} {result['errors']:>6} {result['throughput_rps']:>9.1f} "
+            f"{latency['p50']:>9.2f} {latency['p95']:>9.2f} {latency['p99']:>9.2f} "
+            f"{result['queries_per_request']['mean']:>6.2f}"
+        )
+
+
+async def benchmark(args, names: List[str]) -> dict:
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            await _wait_ready(client, args.ready_timeout)
+            ctx = Context(client, args)
+            await _setup(ctx, names)
+            results = {
+                "meta": {
+                    "created_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+                    "git_commit": _git_commit(),
+                    "python": platform.python_version(),
+                    "database": async_engine.dialect.name,
+                    "dataset": ctx.dataset,
+                    "options": {key: getattr(args, key) for key in
+                                ("requests", "concurrency", "warmup", "page_size", "pages", "upload_kb", "seed")},
+                    "settings": {name: getattr(settings, name) for name in RECORDED_SETTINGS},
+                },
+                "scenarios": {},
+            }
+            for name in names:
+                results["scenarios"][name] = await run_scenario(ctx, SCENARIOS[name])
+                print(f"{name}: done", flush=True)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bench.run", description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated, from: " + ", ".join(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=200, help="timed requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8, help="requests in flight at once")
+    parser.add_argument("--warmup", type=int, default=10, help="untimed requests before each scenario")
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--pages", type=int, default=20, help="list_employees reads one of the first N pages")
+    parser.add_argument("--upload-kb", type=int, default=64)
+    parser.add_argument("--download-files", type=int, default=5)
+    parser.add_argument("--password", default=DEFAULT_PASSWORD)
+    parser.add_argument("--seed", type=int, default=1, help="random seed for the request mix")
+    parser.add_argument("--ready-timeout", type=float, default=120.0)
+    parser.add_argument("--save", metavar="PATH", help="write the results as JSON, e.g. a new baseline")
+    parser.add_argument("--baseline", metavar="PATH", help="compare against a saved run; exit 1 on a regression")
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative change that counts as a regression")
+    args = parser.parse_args(argv)
+
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+    if args.requests < 1 or args.concurrency < 1:
+        parser.error("--requests and --concurrency must be at least 1")
+
+    results = asyncio.run(benchmark(args, names))
+    _print_results(results)
+    if args.save:
+        path = Path(args.save)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"saved {path}")
+    if args.baseline:
+        print()
+        if print_comparison(load(args.baseline), results, args.threshold):
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""Seed the benchmark database with a synthetic org.
+
+    python -m bench.seed --departments 20 --positions 200 --employees 200000 --documents 300000
+
+Rows are generated from ``--seed`` and dated relative to ``--as-of`` (a fixed day
+by default, not today), so two databases seeded with the same options hold the
+same data. ``--reset`` empties the HR tables first; point DATABASE_URL
+at a database you can throw away.
+"""
+import argparse
+import random
+import time
+from datetime import date, datetime, timedelta
+
+from . import DEFAULT_PASSWORD, EMAIL_DOMAIN, configure_environment, user_email
+
+configure_environment()
+
+from sqlalchemy import delete, func, insert, select, text  # noqa: E402
+
+from app.database import engine, init_db  # noqa: E402
+from app.hashing import hash_password  # noqa: E402
+from app.models import models  # noqa: E402
+
+BATCH_SIZE = 5000
+# Default for --as-of: join, issue and expiry dates are spread around this day
+AS_OF = date(2026, 1, 1)
+
+FIRST_NAMES = [
+    "Alex", "Amina", "Boris", "Chen", "Daria", "David", "Elena", "Farid", "Grace", "Hana", "Ivan", "Jamal",
+    "Kate", "Liam", "Maria", "Nikolai", "Olga", "Pavel", "Priya", "Rustam", "Sara", "Timur", "Yuki", "Zara",
+]
+LAST_NAMES = [
+    "Abdullaev", "Brown", "Chen", "Dubois", "Evans", "Fischer", "Garcia", "Hansen", "Ivanova", "Jensen",
+    "Kim", "Lopez", "Martin", "Nguyen", "Novak", "Petrov", "Rossi", "Sato", "Smirnov", "Tanaka",
+    "Usmanov", "Volkova", "Weber", "Yilmaz",
+]
+CITIES = ["Almaty", "Berlin", "Bishkek", "London", "Madrid", "Tashkent", "Tokyo", "Warsaw"]
+DEPARTMENT_NAMES = ["Engineering", "Finance", "HR", "Legal", "Marketing", "Operations", "Sales", "Support"]
+POSITION_NAMES = ["Analyst", "Engineer", "Lead", "Manager", "Specialist", "Coordinator", "Director", "Intern"]
+DOCUMENT_TYPES = ["passport", "contract", "certificate", "visa", "license"]
+STATUSES = [
+    (models.EmployeeStatus.active, 80), (models.EmployeeStatus.on_leave, 7),
+    (models.EmployeeStatus.resigned, 8), (models.EmployeeStatus.terminated, 5),
+]
+
+# Children first, so foreign keys hold at every step
+RESET_TABLES = [
+    models.ExpiringDocument, models.EmployeeSummary, models.EmployeeDocument, models.Document,
+    models.Employee, models.Position, models.Department,
+]
+
+
+def _batches(rows, size: int = BATCH_SIZE):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _insert(conn, model, rows) -> int:
+    count = 0
+    for batch in _batches(rows):
+        conn.execute(insert(model), batch)
+        count += len(batch)
+    return count
+
+
+def _random_date(rng: random.Random, start: date, days: int) -> date:
+    return start + timedelta(days=rng.randrange(days))
+
+
+def _departments(rng: random.Random, count: int, offset: int):
+    for i in range(count):
+        name = DEPARTMENT_NAMES[i % len(DEPARTMENT_NAMES)]
+        yield {"title": f"{name} {offset + i + 1}", "description": f"Synthetic {name.lower()} department"}
+
+
+def _positions(rng: random.Random, count: int, department_ids, offset: int):
+    for i in range(count):
+        # Round-robin first so every department has positions, then random
+        department_id = department_ids[i] if i < len(department_ids) else rng.choice(department_ids)
+        name = POSITION_NAMES[i % len(POSITION_NAMES)]
+        yield {"title": f"{name} {offset + i + 1}", "department_id": department_id, "description": None}
+
+
+def _employees(rng: random.Random, count: int, positions, offset: int, as_of: date):
+    statuses, weights = zip(*STATUSES)
+    now = datetime.combine(as_of, datetime.min.time())
+    for i in range(count):
+        first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        position_id, department_id = rng.choice(positions)
+        ctc = rng.randrange(3000000, 25000000) / 100
+        yield {
+            "first_name": first_name,
+            "last_name": last_name,
+            "email": f"{first_name}.{last_name}.{offset + i + 1}@{EMAIL_DOMAIN}".lower(),
+            "phone": f"+99890{rng.randrange(10 ** 7):07d}" if rng.random() < 0.9 else None,
+            "date_of_birth": _random_date(rng, date(1960, 1, 1), 365 * 42),
+            "gender": rng.choice(list(models.Gender)),
+            "marital_status": rng.choice(list(models.MaritalStatus)),
+            "address": f"{rng.randrange(1, 200)} Synthetic St",
+            "city": rng.choice(CITIES),
+            "employment_type": rng.choice(list(models.EmploymentType)),
+            "work_type": rng.choice(list(models.WorkType)),
+            "department_id": department_id,
+            "position_id": position_id,
+            "working_days": "Mon-Fri",
+            "join_date": _random_date(rng, as_of - timedelta(days=3650), 3650),
+            "ctc": ctc,
+            "monthly_salary": round(ctc / 12, 2),
+            "status": rng.choices(statuses, weights)[0],
+            "created_at": now,
+            "updated_at": now,
+        }
+
+
+def _documents(rng: random.Random, count: int, employee_ids, as_of: date):
+    now = datetime.combine(as_of, datetime.min.time())
+    for _ in range(count):
+        issue_date = _random_date(rng, as_of - timedelta(days=3650), 3650)
+        # Most documents expire somewhere in the five years after as_of, some before it
+        expiry_date = _random_date(rng, as_of - timedelta(days=365), 365 * 6) if rng.random() < 0.7 else None
+        yield {
+            "title": "Synthetic document",
+            "type": rng.choice(DOCUMENT_TYPES),
+            "number": f"{rng.choice('ABCDEFGHKLMNPRST')}{rng.randrange(10 ** 7):07d}",
+            "issue_date": issue_date,
+            "expiry_date": expiry_date,
+            "employee_id": rng.choice(employee_ids),
+            "created_at": now,
+        }
+
+
+def _users(conn, count: int, password: str) -> int:
+    emails = [user_email(i) for i in range(count)]
+    existing = set(conn.scalars(select(models.User.email).where(models.User.email.in_(emails))))
+    missing = [email for email in emails if email not in existing]
+    if not missing:
+        return 0
+    # One hash for all of them: bcrypt at the configured cost is the slow part of seeding
+    hashed = hash_password(password)
+    now = datetime.utcnow()
+    return _insert(conn, models.User, ({"email": email, "name": email.split("@")[0], "password": hashed,
+                                        "created_at": now} for email in missing))
+
+
+def seed(args) -> dict:
+    rng = random.Random(args.seed)
+    counts = {}
+    with engine.begin() as conn:
+        if args.reset:
+            for model in RESET_TABLES:
+                conn.execute(delete(model))
+        else:
+            # Derived tables are rebuilt by the app on its next start
+            conn.execute(delete(models.ExpiringDocument))
+            conn.execute(delete(models.EmployeeSummary))
+
+        offset = conn.scalar(select(func.count()).select_from(models.Department))
+        counts["departments"] = _insert(conn, models.Department, _departments(rng, args.departments, offset))
+        department_ids = list(conn.scalars(select(models.Department.department_id).order_by(models.Department.department_id)))
+
+        offset = conn.scalar(select(func.count()).select_from(models.Position))
+        counts["positions"] = _insert(conn, models.Position, _positions(rng, args.positions, department_ids[-args.departments:], offset))
+        positions = conn.execute(select(models.Position.position_id, models.Position.department_id)).all()
+
+        offset = conn.scalar(select(func.max(models.Employee.employee_id))) or 0
+        started = time.perf_counter()
+        counts["employees"] = _insert(conn, models.Employee, _employees(rng, args.employees, positions, offset, args.as_of))
+        print(f"employees: {counts['employees']} rows in {time.perf_counter() - started:.1f}s")
+        employee_ids = list(conn.scalars(select(models.Employee.employee_id)))
+
+        started = time.perf_counter()
+        counts["documents"] = _insert(conn, models.Document, _documents(rng, args.documents if employee_ids else 0, employee_ids, args.as_of))
+        print(f"documents: {counts['documents']} rows in {time.perf_counter() - started:.1f}s")
+
+        counts["users"] = _users(conn, args.users, args.password)
+
+    # Fresh planner statistics, as a production database would have after autovacuum
+    with engine.connect() as conn:
+        conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+        conn.execute(text("ANALYZE"))
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bench.seed", description=__doc__.splitlines()[0])
+    parser.add_argument("--departments", type=int, default=20)
+    parser.add_argument("--positions", type=int, default=200)
+    parser.add_argument("--employees", type=int, default=200000)
+    parser.add_argument("--documents", type=int, default=300000)
+    parser.add_argument("--users", type=int, default=10, help="login accounts, bench-user<N>@" + EMAIL_DOMAIN)
+    parser.add_argument("--password", default=DEFAULT_PASSWORD)
+    parser.add_argument("--seed", type=int, default=42, help="random seed; same seed, same data")
+    parser.add_argument("--as-of", type=date.fromisoformat, default=AS_OF, metavar="YYYY-MM-DD",
+                        help=f"day the generated dates are relative to (default {AS_OF})")
+    parser.add_argument("--reset", action="store_true", help="delete existing HR rows first")
+    args = parser.parse_args(argv)
+    if args.departments < 1 or args.positions < 1:
+        parser.error("at least one department and one position are needed")
+
+    init_db()  # migrations and search indexes, as the app applies them
+    started = time.perf_counter()
+    counts = seed(args)
+    print(", ".join(f"{name}: {count}" for name, count in counts.items()), f"({time.perf_counter() - started:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
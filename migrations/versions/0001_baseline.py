@@ -0,0 +1,104 @@
+"""Baseline: the schema as created by create_all before migrations existed
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("email", sa.String()),
+        sa.Column("name", sa.String()),
+        sa.Column("password", sa.String()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_email", "users", ["email"])
+
+    op.create_table(
+        "departments",
+        sa.Column("department_id", sa.Integer(), primary_key=True),
+        sa.Column("title", sa.String(100), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+    op.create_index("ix_departments_department_id", "departments", ["department_id"])
+
+    op.create_table(
+        "positions",
+        sa.Column("position_id", sa.Integer(), primary_key=True),
+        sa.Column("title", sa.String(100), nullable=False),
+        sa.Column("department_id", sa.Integer(), sa.ForeignKey("departments.department_id")),
+        sa.Column("description", sa.Text()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+    op.create_index("ix_positions_position_id", "positions", ["position_id"])
+
+    op.create_table(
+        "employees",
+        sa.Column("employee_id", sa.Integer(), primary_key=True),
+        sa.Column("first_name", sa.String(50), nullable=False),
+        sa.Column("last_name", sa.String(50), nullable=False),
+        sa.Column("email", sa.String(100), nullable=False, unique=True),
+        sa.Column("phone", sa.String(20)),
+        sa.Column("date_of_birth", sa.Date()),
+        sa.Column("gender", sa.Enum("male", "female", "other", name="gender")),
+        sa.Column("marital_status", sa.Enum("single", "married", "divorced", "widowed", name="maritalstatus")),
+        sa.Column("address", sa.Text()),
+        sa.Column("city", sa.String(50)),
+        sa.Column("employment_type", sa.Enum("full_time", "part_time", "contract", "intern", name="employmenttype")),
+        sa.Column("work_type", sa.Enum("office", "remote", "hybrid", name="worktype")),
+        sa.Column("department_id", sa.Integer(), sa.ForeignKey("departments.department_id")),
+        sa.Column("position_id", sa.Integer(), sa.ForeignKey("positions.position_id")),
+        sa.Column("working_days", sa.String(20)),
+        sa.Column("join_date", sa.Date()),
+        sa.Column("ctc", sa.Numeric(12, 2)),
+        sa.Column("monthly_salary", sa.Numeric(10, 2)),
+        sa.Column("status", sa.Enum("active", "on_leave", "resigned", "terminated", name="employeestatus")),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+    op.create_index("ix_employees_employee_id", "employees", ["employee_id"])
+
+    op.create_table(
+        "employee_documents",
+        sa.Column("document_id", sa.Integer(), primary_key=True),
+        sa.Column("employee_id", sa.Integer(), sa.ForeignKey("employees.employee_id")),
+        sa.Column("document_type", sa.String(50), nullable=False),
+        sa.Column("document_path", sa.String(255), nullable=False),
+        sa.Column("uploaded_at", sa.DateTime()),
+    )
+    op.create_index("ix_employee_documents_document_id", "employee_documents", ["document_id"])
+
+    op.create_table(
+        "documents",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("type", sa.String(), nullable=False),
+        sa.Column("number", sa.String()),
+        sa.Column("issue_date", sa.Date()),
+        sa.Column("expiry_date", sa.Date()),
+        sa.Column("employee_id", sa.Integer(), sa.ForeignKey("employees.employee_id")),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_documents_id", "documents", ["id"])
+
+
+def downgrade():
+    for table in ("documents", "employee_documents", "employees", "positions", "departments", "users"):
+        op.drop_table(table)
+    for enum_name in ("gender", "maritalstatus", "employmenttype", "worktype", "employeestatus"):
+        sa.Enum(name=enum_name).drop(op.get_bind(), checkfirst=True)
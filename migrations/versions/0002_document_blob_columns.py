@@ -0,0 +1,43 @@
+"""Content-addressed storage columns on employee_documents
+
+create_all added these only to databases created after the blob store
+landed; older databases get them here.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+COLUMNS = [
+    sa.Column("content_hash", sa.String(64)),
+    sa.Column("size_bytes", sa.BigInteger()),
+    sa.Column("original_filename", sa.String(255)),
+    sa.Column("content_type", sa.String(100)),
+]
+
+
+def upgrade():
+    existing, indexes = set(), set()
+    if not op.get_context().as_sql:
+        inspector = sa.inspect(op.get_bind())
+        existing = {column["name"] for column in inspector.get_columns("employee_documents")}
+        indexes = {index["name"] for index in inspector.get_indexes("employee_documents")}
+    for column in COLUMNS:
+        if column.name not in existing:
+            op.add_column("employee_documents", column)
+    if "ix_employee_documents_content_hash" not in indexes:
+        op.create_index("ix_employee_documents_content_hash", "employee_documents", ["content_hash"])
+
+
+def downgrade():
+    op.drop_index("ix_employee_documents_content_hash", table_name="employee_documents")
+    for column in reversed(COLUMNS):
+        op.drop_column("employee_documents", column.name)
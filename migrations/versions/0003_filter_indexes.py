@@ -0,0 +1,58 @@
+"""Indexes for the employee filter/sort patterns and the foreign keys
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+ACTIVE = sa.text("status = 'active'")
+HASHED = sa.text("content_hash IS NOT NULL")
+
+
+def upgrade():
+    # Filtered listings: status, then department, in last_name order; employee_id is
+    # the keyset tie-breaker so cursor pages are served straight from the index
+    op.create_index(
+        "ix_employees_status_department_last_name", "employees",
+        ["status", "department_id", "last_name", "employee_id"], if_not_exists=True,
+    )
+    # Department filter without status; also covers the department_id foreign key
+    op.create_index(
+        "ix_employees_department_last_name", "employees",
+        ["department_id", "last_name", "employee_id"], if_not_exists=True,
+    )
+    op.create_index("ix_employees_position_id", "employees", ["position_id"], if_not_exists=True)
+    # Default advanced-search order (last_name) over the active workforce
+    op.create_index(
+        "ix_employees_active_last_name", "employees", ["last_name", "employee_id"],
+        postgresql_where=ACTIVE, sqlite_where=ACTIVE, if_not_exists=True,
+    )
+
+    op.create_index("ix_positions_department_id", "positions", ["department_id"], if_not_exists=True)
+    op.create_index("ix_employee_documents_employee_id", "employee_documents", ["employee_id"], if_not_exists=True)
+    # Upload de-duplication looks up (employee, type, hash); legacy rows without a hash are left out
+    op.create_index(
+        "ix_employee_documents_employee_type_hash", "employee_documents",
+        ["employee_id", "document_type", "content_hash"],
+        postgresql_where=HASHED, sqlite_where=HASHED, if_not_exists=True,
+    )
+    op.create_index("ix_documents_employee_id", "documents", ["employee_id"], if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index("ix_documents_employee_id", table_name="documents")
+    op.drop_index("ix_employee_documents_employee_type_hash", table_name="employee_documents")
+    op.drop_index("ix_employee_documents_employee_id", table_name="employee_documents")
+    op.drop_index("ix_positions_department_id", table_name="positions")
+    op.drop_index("ix_employees_active_last_name", table_name="employees")
+    op.drop_index("ix_employees_position_id", table_name="employees")
+    op.drop_index("ix_employees_department_last_name", table_name="employees")
+    op.drop_index("ix_employees_status_department_last_name", table_name="employees")
@@ -0,0 +1,40 @@
+"""Pre-aggregated employee summary for the analytics endpoints
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # employeestatus already exists on Postgres (created with the employees table)
+    status = sa.Enum("active", "on_leave", "resigned", "terminated", name="employeestatus")
+    if op.get_context().dialect.name == "postgresql":
+        status = postgresql.ENUM("active", "on_leave", "resigned", "terminated", name="employeestatus", create_type=False)
+    op.create_table(
+        "employee_summary",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("department_id", sa.Integer()),
+        sa.Column("status", status),
+        sa.Column("headcount", sa.Integer(), nullable=False),
+        sa.Column("ctc_count", sa.Integer(), nullable=False),
+        sa.Column("ctc_total", sa.Numeric(16, 2), nullable=False),
+        sa.Column("monthly_salary_count", sa.Integer(), nullable=False),
+        sa.Column("monthly_salary_total", sa.Numeric(16, 2), nullable=False),
+        sa.Column("refreshed_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_employee_summary_department_id", "employee_summary", ["department_id"])
+
+
+def downgrade():
+    op.drop_index("ix_employee_summary_department_id", table_name="employee_summary")
+    op.drop_table("employee_summary")
@@ -0,0 +1,39 @@
+"""Index on documents.expiry_date and the precomputed expiring documents table
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_documents_expiry_date", "documents", ["expiry_date"], if_not_exists=True)
+    op.create_table(
+        "expiring_documents",
+        sa.Column("document_id", sa.Integer(), primary_key=True),
+        sa.Column("employee_id", sa.Integer()),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("type", sa.String(), nullable=False),
+        sa.Column("number", sa.String()),
+        sa.Column("expiry_date", sa.Date(), nullable=False),
+        sa.Column("scanned_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_expiring_documents_employee_id", "expiring_documents", ["employee_id"])
+    op.create_index(
+        "ix_expiring_documents_expiry_date_document_id", "expiring_documents", ["expiry_date", "document_id"]
+    )
+
+
+def downgrade():
+    op.drop_index("ix_expiring_documents_expiry_date_document_id", table_name="expiring_documents")
+    op.drop_index("ix_expiring_documents_employee_id", table_name="expiring_documents")
+    op.drop_table("expiring_documents")
+    op.drop_index("ix_documents_expiry_date", table_name="documents")
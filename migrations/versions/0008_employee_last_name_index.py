@@ -0,0 +1,25 @@
+"""Unfiltered last_name index for the default employee sort
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The partial ix_employees_active_last_name only serves status='active' filters; listings and
+    # advanced search without a filter seek on (last_name, employee_id) over every employee
+    op.create_index(
+        "ix_employees_last_name_employee_id", "employees", ["last_name", "employee_id"], if_not_exists=True,
+    )
+
+
+def downgrade():
+    op.drop_index("ix_employees_last_name_employee_id", table_name="employees")